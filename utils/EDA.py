@@ -1,8 +1,24 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
 import pandas as pd
 import scipy.stats as stats
 
+from .model import RidesModel
+from .parallel import parallel_moments, parallel_total_price
+from .profiling import profiled
+from .revenue import (
+    ADDITIVE_AGGREGATIONS,
+    REVENUE_AGGREGATIONS,
+    total_price_from_aggregates,
+)
+
 
-def get_total_price_by_rule(df: pd.DataFrame, rule: str = "ME") -> pd.Series:
+@profiled
+def get_total_price_by_rule(
+        df: Union[pd.DataFrame, RidesModel], rule: str = "ME", n_jobs: Optional[int] = 1
+) -> pd.Series:
     """
     Агрегирует данные о поездках за указанный период и вычисляет общую выручку.
 
@@ -11,12 +27,17 @@ def get_total_price_by_rule(df: pd.DataFrame, rule: str = "ME") -> pd.Series:
     для каждого периода.
 
     Args:
-        df (pd.DataFrame): Исходный DataFrame, содержащий данные о поездках.
-            Обязательные колонки: 'date' (в формате datetime), 'minute_price',
-            'duration', 'start_ride_price', 'user_id', 'subscription_fee'.
+        df (Union[pd.DataFrame, RidesModel]): Исходный DataFrame, содержащий данные о поездках,
+            или нормализованная модель `RidesModel` (из нее разворачиваются только
+            нужные колонки). Обязательные колонки: 'date' (в формате datetime),
+            'minute_price', 'duration', 'start_ride_price', 'user_id', 'subscription_fee'.
         rule (str, optional): Правило ресемплинга для агрегации по времени.
             Используется стандартные строки Pandas (например, 'ME' для месяца,
             'W' для недели, 'D' для дня). По умолчанию 'ME' (конец месяца).
+        n_jobs (Optional[int], optional): Количество процессов. При значении, отличном
+            от 1, расчет выполняется `parallel_total_price` по частям в разделяемой
+            памяти (None — все ядра). Результат совпадает с последовательным.
+            По умолчанию 1.
 
     Returns:
         pd.Series: Серия, индексированная датой (периодом агрегации), содержащая
@@ -31,30 +52,206 @@ def get_total_price_by_rule(df: pd.DataFrame, rule: str = "ME") -> pd.Series:
         >>> monthly_revenue = get_total_price_by_rule(trips_df, rule='ME')
         >>> weekly_revenue = get_total_price_by_rule(trips_df, rule='W')
     """
-    df = df.copy()
-    df.index = df["date"]
-
-    df = df.resample(rule=rule).aggregate(
-        {
-            "minute_price": "max",
-            "duration": "sum",
-            "start_ride_price": "sum",
-            "user_id": "nunique",  # NOQA
-            "subscription_fee": "max",
-        }
-    )
+    if isinstance(df, RidesModel):
+        df = df.frame(["date", *REVENUE_AGGREGATIONS]).astype({"duration": float})
+
+    if n_jobs != 1:
+        return parallel_total_price(df, rule, n_jobs)
+
+    df = df.resample(rule=rule, on="date").aggregate(REVENUE_AGGREGATIONS)
+
+    return total_price_from_aggregates(df)
+
+
+def split_by_subscription(
+        data: Union[pd.DataFrame, RidesModel], with_sub: str = "ultra"
+) -> tuple[Union[pd.DataFrame, RidesModel], Union[pd.DataFrame, RidesModel]]:
+    """
+    Делит поездки на пользователей с подпиской и без нее, как в EDA.ipynb.
+
+    Для `RidesModel` маска строится по справочнику пользователей, без
+    разворачивания 'subscription_type' до уровня поездок.
+
+    Args:
+        data (Union[pd.DataFrame, RidesModel]): Объединенная таблица или модель `RidesModel`.
+        with_sub (str, optional): Тип подписки, считающийся платной. По умолчанию 'ultra'.
+
+    Returns:
+        tuple: (поездки с подпиской, поездки без подписки) того же типа, что и `data`.
+
+    Example:
+        >>> users_with_sub, users_no_sub = split_by_subscription(RidesModel.load())
+        >>> get_total_price_by_rule(users_with_sub, "ME")
+    """
+    if isinstance(data, RidesModel):
+        no_sub = [
+            value for value in data.subscriptions["subscription_type"].astype(object) if value != with_sub
+        ]
+        return data.segment(subscription_type=with_sub), data.segment(subscription_type=no_sub)
+
+    mask = data["subscription_type"] == with_sub
+    return data[mask], data[~mask]
+
+
+@dataclass(frozen=True)
+class RevenueCube:
+    """
+    Предагрегированный куб выручки: день × измерения сегментации.
+
+    Attributes:
+        cells (pd.DataFrame): Агрегаты по ячейкам куба. Индекс — ('date', *dimensions),
+            колонки — 'minute_price' (max), 'duration' (sum), 'start_ride_price' (sum),
+            'subscription_fee' (max) и 'rides' (количество поездок).
+        users (pd.DataFrame): Уникальные пары ('cell', 'user_id'), где 'cell' —
+            номер строки в `cells`. Нужны для точного подсчета уникальных
+            пользователей при сворачивании в недели и месяцы.
+        dimensions (tuple[str, ...]): Имена измерений сегментации.
+    """
+
+    cells: pd.DataFrame
+    users: pd.DataFrame
+    dimensions: tuple[str, ...]
+
+
+@profiled
+def build_revenue_cube(
+        df: pd.DataFrame,
+        dimensions: tuple[str, ...] = ("subscription_type", "city"),
+) -> RevenueCube:
+    """
+    Строит куб выручки за один проход по поездкам.
+
+    Поездки группируются по дню и измерениям `dimensions`; для каждой ячейки
+    сохраняются аддитивные агрегаты формулы выручки и множество пользователей.
+    После этого любая комбинация правила ресемплинга и сегмента считается
+    функциями `get_total_price_from_cube` и `get_percent_with_sub` без обращения
+    к исходным поездкам.
+
+    Args:
+        df (pd.DataFrame): Объединенные данные о поездках. Обязательные колонки:
+            'date' (datetime), 'minute_price', 'duration', 'start_ride_price',
+            'user_id', 'subscription_fee' и колонки из `dimensions`.
+        dimensions (tuple[str, ...], optional): Колонки сегментации.
+            По умолчанию ('subscription_type', 'city').
 
-    df["total_price"] = (
-        df["minute_price"] * df["duration"]
-        + df["start_ride_price"]
-        + df["subscription_fee"] * df["user_id"]
+    Returns:
+        RevenueCube: Куб выручки.
+
+    Example:
+        >>> cube = build_revenue_cube(rides_users_subscriptions_df)
+        >>> weekly_ultra = get_total_price_from_cube(cube, "W", subscription_type="ultra")
+    """
+    dimensions = tuple(dimensions)
+    grouped = df.groupby([df["date"].dt.normalize(), *dimensions], sort=True, observed=True)
+
+    cells = grouped[list(ADDITIVE_AGGREGATIONS)].agg(ADDITIVE_AGGREGATIONS)
+    cells["rides"] = grouped.size()
+
+    cell_ids = grouped.ngroup().to_numpy(dtype=np.int64)
+    user_ids = df["user_id"].to_numpy(dtype=np.int64)
+    pairs = np.unique(np.column_stack([cell_ids, user_ids]), axis=0)
+    users = pd.DataFrame({"cell": pairs[:, 0], "user_id": pairs[:, 1]})
+
+    return RevenueCube(cells=cells, users=users, dimensions=dimensions)
+
+
+@profiled
+def get_total_price_from_cube(
+        cube: RevenueCube,
+        rule: str = "ME",
+        **segment: Union[str, list[str]],
+) -> pd.Series:
+    """
+    Вычисляет выручку по периодам для сегмента из куба выручки.
+
+    Результат совпадает с `get_total_price_by_rule`, примененной к поездкам
+    выбранного сегмента, но считается по ячейкам куба.
+
+    Args:
+        cube (RevenueCube): Куб из `build_revenue_cube`.
+        rule (str, optional): Правило ресемплинга Pandas ('ME', 'W', 'D' и т.д.).
+            По умолчанию 'ME'.
+        **segment: Фильтры по измерениям куба: значение или список значений,
+            например `subscription_type="ultra"` или `city=["Омск", "Тюмень"]`.
+
+    Returns:
+        pd.Series: Серия 'total_price', индексированная датой периода.
+
+    Raises:
+        KeyError: Если фильтр задан по колонке, которой нет среди измерений куба.
+
+    Example:
+        >>> get_total_price_from_cube(cube, "ME", subscription_type="free")
+    """
+    cells = cube.cells.reset_index()
+    cells["cell"] = np.arange(len(cells))
+
+    for dimension, values in segment.items():
+        if dimension not in cube.dimensions:
+            raise KeyError(f"Измерение отсутствует в кубе: {dimension}")
+        values = [values] if isinstance(values, str) else list(values)
+        cells = cells[cells[dimension].isin(values)]
+
+    aggregated = cells.resample(rule, on="date").agg(ADDITIVE_AGGREGATIONS)
+
+    users = cube.users[cube.users["cell"].isin(cells["cell"])]
+    users = users.assign(date=cells.set_index("cell")["date"].reindex(users["cell"]).to_numpy())
+    aggregated["user_id"] = (
+        users.resample(rule, on="date")["user_id"]
+        .nunique()
+        .reindex(aggregated.index, fill_value=0)
     )
 
-    return df["total_price"]
+    return total_price_from_aggregates(aggregated)
+
+
+@profiled
+def get_percent_with_sub(
+        cube: RevenueCube,
+        rule: str = "ME",
+        with_sub: str = "ultra",
+        ndigits: Optional[int] = 2,
+) -> pd.DataFrame:
+    """
+    Строит таблицу общей выручки и долей пользователей с подпиской и без нее.
+
+    Повторяет расчет из EDA.ipynb: выручка считается отдельно для поездок
+    с `subscription_type == with_sub` и для остальных, затем складывается.
+
+    Args:
+        cube (RevenueCube): Куб из `build_revenue_cube` с измерением 'subscription_type'.
+        rule (str, optional): Правило ресемплинга Pandas. По умолчанию 'ME'.
+        with_sub (str, optional): Тип подписки, считающийся платной. По умолчанию 'ultra'.
+        ndigits (Optional[int], optional): Точность округления долей. Если None,
+            доли не округляются. По умолчанию 2.
+
+    Returns:
+        pd.DataFrame: Колонки 'total_price', 'percent_with_sub', 'percent_no_sub',
+        индекс — дата периода.
+    """
+    no_sub = [
+        value
+        for value in cube.cells.index.get_level_values("subscription_type").unique()
+        if value != with_sub
+    ]
+    total_price_with_sub = get_total_price_from_cube(cube, rule, subscription_type=with_sub)
+    total_price_no_sub = get_total_price_from_cube(cube, rule, subscription_type=no_sub)
+
+    total_price = (total_price_no_sub + total_price_with_sub).to_frame()
+    total_price["percent_with_sub"] = total_price_with_sub / total_price["total_price"]
+    total_price["percent_no_sub"] = total_price_no_sub / total_price["total_price"]
+
+    if ndigits is not None:
+        total_price[["percent_with_sub", "percent_no_sub"]] = total_price[
+            ["percent_with_sub", "percent_no_sub"]
+        ].round(ndigits)
 
+    return total_price
 
+
+@profiled
 def check_ttest_1samp(
-    df: pd.DataFrame, popmean: float, alternative: str, _alpha: float = 0.05
+    df: pd.DataFrame, popmean: float, alternative: str, _alpha: float = 0.05, n_jobs: Optional[int] = 1
 ) -> None:
     """
     Выполняет одновыборочный t-тест Стьюдента и выводит интерпретацию результата.
@@ -71,6 +268,9 @@ def check_ttest_1samp(
             'greater' (больше).
         _alpha (float, optional): Уровень значимости для принятия решения.
             По умолчанию 0.05.
+        n_jobs (Optional[int], optional): Количество процессов. При значении, отличном
+            от 1, объем, среднее и дисперсия выборки считаются `parallel_moments`,
+            а t-статистика — по ним (None — все ядра). По умолчанию 1.
 
     Returns:
         None: Функция выводит результат в консоль.
@@ -84,19 +284,30 @@ def check_ttest_1samp(
         Нулевая гипотеза (H0): среднее выборки равно `popmean`.
         Решение принимается сравнением p-value с уровнем значимости `_alpha`.
     """
-    result = stats.ttest_1samp(df, popmean, alternative=alternative)
+    if n_jobs != 1:
+        n, mean, var = parallel_moments(df, n_jobs)
+        statistic = (mean - popmean) / np.sqrt(var / n)
+        pvalue = _t_pvalue(np.float64(statistic), np.float64(n - 1), alternative)
+    else:
+        result = stats.ttest_1samp(df, popmean, alternative=alternative)
+        statistic, pvalue = result.statistic, result.pvalue
 
-    print("T-statistic: {}".format(result.statistic))
-    print("P-value: {}".format(result.pvalue))
+    print("T-statistic: {}".format(statistic))
+    print("P-value: {}".format(pvalue))
 
-    if result.pvalue < _alpha:
+    if pvalue < _alpha:
         print("Отклоняем нулевую гипотезу.")
     else:
         print("Нет оснований отклонить нулевую гипотезу.")
 
 
+@profiled
 def check_ttest_ind(
-    df1: pd.DataFrame, df2: pd.DataFrame, alternative: str, _alpha: float = 0.05
+    df1: pd.DataFrame,
+    df2: pd.DataFrame,
+    alternative: str,
+    _alpha: float = 0.05,
+    n_jobs: Optional[int] = 1,
 ) -> None:
     """
     Выполняет двухвыборочный t-тест Стьюдента для независимых выборок и выводит результат.
@@ -113,6 +324,9 @@ def check_ttest_ind(
             меньше среднего df2), 'greater' (среднее df1 больше среднего df2).
         _alpha (float, optional): Уровень значимости для принятия решения.
             По умолчанию 0.05.
+        n_jobs (Optional[int], optional): Количество процессов. При значении, отличном
+            от 1, объем, среднее и дисперсия каждой выборки считаются `parallel_moments`,
+            а тест — `stats.ttest_ind_from_stats` (None — все ядра). По умолчанию 1.
 
     Returns:
         None: Функция выводит результат в консоль.
@@ -128,11 +342,208 @@ def check_ttest_ind(
         Используется критерий Уэлча, который надежнее при неравных дисперсиях и
         размерах выборок.
     """
-    result = stats.ttest_ind(df1, df2, alternative=alternative, equal_var=False)
+    if n_jobs != 1:
+        (n1, mean1, var1), (n2, mean2, var2) = parallel_moments(df1, n_jobs), parallel_moments(df2, n_jobs)
+        result = stats.ttest_ind_from_stats(
+            mean1, np.sqrt(var1), n1, mean2, np.sqrt(var2), n2, equal_var=False, alternative=alternative
+        )
+    else:
+        result = stats.ttest_ind(df1, df2, alternative=alternative, equal_var=False)
     print("T-statistic: {}".format(result.statistic))
     print("P-value: {}".format(result.pvalue))
 
     if result.pvalue < _alpha:
         print("Отклоняем нулевую гипотезу.")
     else:
-        print("Нет оснований отклонить нулевую гипотезу.")
\ No newline at end of file
+        print("Нет оснований отклонить нулевую гипотезу.")
+
+
+def _t_pvalue(statistic: np.ndarray, dof: np.ndarray, alternative: str) -> np.ndarray:
+    """Считает p-value t-статистики для заданной альтернативной гипотезы."""
+    if alternative == "two-sided":
+        return 2 * stats.t.sf(np.abs(statistic), dof)
+    if alternative == "greater":
+        return stats.t.sf(statistic, dof)
+    if alternative == "less":
+        return stats.t.cdf(statistic, dof)
+    raise ValueError(f"Неизвестная альтернативная гипотеза: {alternative}")
+
+
+def adjust_pvalues(pvalues: np.ndarray, method: Optional[str] = None) -> np.ndarray:
+    """
+    Применяет поправку на множественную проверку гипотез.
+
+    Args:
+        pvalues (np.ndarray): Массив p-value. Значения NaN не участвуют в поправке.
+        method (Optional[str], optional): Метод поправки: 'bonferroni', 'holm'
+            (Холм–Бонферрони) или 'fdr_bh' (Бенджамини–Хохберг). Если None,
+            p-value возвращаются без изменений. По умолчанию None.
+
+    Returns:
+        np.ndarray: Скорректированные p-value той же формы.
+
+    Raises:
+        ValueError: Если передан неизвестный метод поправки.
+    """
+    pvalues = np.asarray(pvalues, dtype=float)
+    if method is None:
+        return pvalues.copy()
+
+    adjusted = np.full_like(pvalues, np.nan)
+    valid = ~np.isnan(pvalues)
+    p = pvalues[valid]
+    m = p.size
+    if m == 0:
+        return adjusted
+
+    if method == "bonferroni":
+        result = p * m
+    elif method == "holm":
+        order = np.argsort(p)
+        steps = p[order] * (m - np.arange(m))
+        result = np.empty(m)
+        result[order] = np.maximum.accumulate(steps)
+    elif method == "fdr_bh":
+        order = np.argsort(p)[::-1]
+        steps = p[order] * m / np.arange(m, 0, -1)
+        result = np.empty(m)
+        result[order] = np.minimum.accumulate(steps)
+    else:
+        raise ValueError(f"Неизвестный метод поправки: {method}")
+
+    adjusted[valid] = np.minimum(result, 1.0)
+    return adjusted
+
+
+def _with_decisions(
+        result: pd.DataFrame, alpha: float, correction: Optional[str]
+) -> pd.DataFrame:
+    """Добавляет скорректированные p-value и решение по каждой гипотезе."""
+    result["pvalue_adj"] = adjust_pvalues(result["pvalue"].to_numpy(), correction)
+    result["reject"] = result["pvalue_adj"] < alpha
+    return result
+
+
+@profiled
+def batch_ttest_1samp(
+        df: pd.DataFrame,
+        column: str,
+        by: Union[str, list],
+        popmean: float,
+        alternative: str = "two-sided",
+        _alpha: float = 0.05,
+        correction: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Выполняет одновыборочный t-тест сразу для всех групп данных.
+
+    Для каждой группы считаются достаточные статистики (n, среднее, дисперсия),
+    после чего t-статистики и p-value вычисляются векторно, без вызова scipy
+    на каждую группу. Результаты совпадают со `scipy.stats.ttest_1samp`.
+
+    Args:
+        df (pd.DataFrame): Входные данные.
+        column (str): Числовая колонка, по которой проверяется гипотеза.
+        by (Union[str, list]): Ключи группировки в формате `DataFrame.groupby`
+            (имена колонок и/или Series, например `df["date"].dt.month`).
+        popmean (float): Среднее значение согласно нулевой гипотезе (H0).
+        alternative (str, optional): 'two-sided', 'less' или 'greater'.
+            По умолчанию 'two-sided'.
+        _alpha (float, optional): Уровень значимости. По умолчанию 0.05.
+        correction (Optional[str], optional): Поправка на множественную проверку,
+            см. `adjust_pvalues`. По умолчанию None.
+
+    Returns:
+        pd.DataFrame: По строке на группу с колонками 'n', 'mean', 'var',
+        'statistic', 'df', 'pvalue', 'pvalue_adj', 'reject'.
+
+    Example:
+        >>> batch_ttest_1samp(df, "distance", by="city", popmean=3130, alternative="less")
+    """
+    result = df.groupby(by, observed=True)[column].agg(n="count", mean="mean", var="var")
+
+    n = result["n"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = (result["mean"].to_numpy() - popmean) / np.sqrt(result["var"].to_numpy() / n)
+
+    result["statistic"] = statistic
+    result["df"] = n - 1
+    result["pvalue"] = _t_pvalue(statistic, n - 1, alternative)
+
+    return _with_decisions(result, _alpha, correction)
+
+
+@profiled
+def batch_ttest_ind(
+        df: pd.DataFrame,
+        column: str,
+        by: Union[str, list],
+        split: str,
+        groups: tuple,
+        alternative: str = "two-sided",
+        _alpha: float = 0.05,
+        correction: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Выполняет t-тест Уэлча для двух независимых выборок сразу во всех группах.
+
+    Внутри каждой группы `by` данные делятся по колонке `split` на две выборки
+    `groups[0]` и `groups[1]`. По достаточным статистикам выборок (n, среднее,
+    дисперсия) t-статистики, степени свободы Уэлча–Саттертуэйта и p-value
+    вычисляются векторно. Результаты совпадают со
+    `scipy.stats.ttest_ind(..., equal_var=False)`.
+
+    Args:
+        df (pd.DataFrame): Входные данные.
+        column (str): Числовая колонка, по которой сравниваются выборки.
+        by (Union[str, list]): Ключи группировки в формате `DataFrame.groupby`.
+        split (str): Колонка, значения которой задают две выборки.
+        groups (tuple): Пара значений `split`: (первая выборка, вторая выборка).
+        alternative (str, optional): 'two-sided', 'less' (среднее первой выборки меньше)
+            или 'greater' (больше). По умолчанию 'two-sided'.
+        _alpha (float, optional): Уровень значимости. По умолчанию 0.05.
+        correction (Optional[str], optional): Поправка на множественную проверку,
+            см. `adjust_pvalues`. По умолчанию None.
+
+    Returns:
+        pd.DataFrame: По строке на группу с колонками 'n1', 'mean1', 'var1', 'n2',
+        'mean2', 'var2', 'statistic', 'df', 'pvalue', 'pvalue_adj', 'reject'.
+        Группы, где одной из выборок нет, получают NaN в статистиках.
+
+    Example:
+        >>> # Дольше ли поездки с подпиской в каждом городе и месяце
+        >>> batch_ttest_ind(
+        ...     df, "duration", by=["city", df["date"].dt.month],
+        ...     split="subscription_type", groups=("ultra", "free"),
+        ...     alternative="greater", correction="holm",
+        ... )
+    """
+    by = by if isinstance(by, list) else [by]
+    first, second = groups
+
+    sufficient = (
+        df[df[split].isin([first, second])]
+        .groupby([*by, split], observed=True)[column]
+        .agg(["count", "mean", "var"])
+        .unstack(split)
+    )
+
+    result = pd.DataFrame(index=sufficient.index)
+    for suffix, value in (("1", first), ("2", second)):
+        result["n" + suffix] = sufficient.get(("count", value), np.nan)
+        result["mean" + suffix] = sufficient.get(("mean", value), np.nan)
+        result["var" + suffix] = sufficient.get(("var", value), np.nan)
+    result[["n1", "n2"]] = result[["n1", "n2"]].fillna(0)
+
+    n1, n2 = result["n1"].to_numpy(dtype=float), result["n2"].to_numpy(dtype=float)
+    se1 = result["var1"].to_numpy() / n1
+    se2 = result["var2"].to_numpy() / n2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = (result["mean1"].to_numpy() - result["mean2"].to_numpy()) / np.sqrt(se1 + se2)
+        dof = (se1 + se2) ** 2 / (se1**2 / (n1 - 1) + se2**2 / (n2 - 1))
+
+    result["statistic"] = statistic
+    result["df"] = dof
+    result["pvalue"] = _t_pvalue(statistic, dof, alternative)
+
+    return _with_decisions(result, _alpha, correction)
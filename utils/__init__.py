@@ -1,7 +1,44 @@
 from .paths import joinpath
 
-from .overview import print_shape_data, print_duplicates, print_categorical_data
+from .loader import load_data
 
-from .vizualization import hist_boxplot, scatterplot
+from .cleaning import clean_data_streaming
 
-from .EDA import get_total_price_by_rule, check_ttest_ind
+from .overview import (
+    print_shape_data,
+    print_duplicates,
+    print_categorical_data,
+    find_duplicates_streaming,
+    profile_categorical_streaming,
+)
+
+from .vizualization import hist_boxplot, scatterplot, FigureSpec, export_figures
+
+from .profiling import profiling, profile_stats, export_trace
+
+from .EDA import (
+    get_total_price_by_rule,
+    check_ttest_ind,
+    build_revenue_cube,
+    get_total_price_from_cube,
+    get_percent_with_sub,
+    split_by_subscription,
+    batch_ttest_1samp,
+    batch_ttest_ind,
+)
+
+from .revenue import RevenueAggregator
+
+from .resampling import bootstrap_ci, permutation_test
+
+from .planning import binom_min_trials, binom_cdf_normal
+
+from .parallel import parallel_total_price, parallel_moments
+
+from .model import RidesModel
+
+from .user_index import UserRideIndex
+
+from .pipeline import run_pipeline, read_stage_output
+
+from .service import QueryService
@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+from .EDA import (
+    batch_ttest_ind,
+    build_revenue_cube,
+    check_ttest_ind,
+    get_total_price_by_rule,
+)
+from .cleaning import clean_data_streaming
+from .overview import print_duplicates
+from .synthetic import fit_rides_model, generate_dataset
+
+DEFAULT_SCALES = (10_000, 100_000, 1_000_000)
+
+
+def _measure(func: Callable, repeat: int) -> tuple[float, float]:
+    """Возвращает лучшее время выполнения (с) и пиковую память (МБ) функции."""
+    # Время и память замеряются в разных запусках: tracemalloc заметно замедляет код
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def _cases(directory: Path) -> dict[str, Callable]:
+    """Собирает измеряемые функции для набора данных в каталоге `directory`."""
+    paths = {name: directory / f"{name}.csv" for name in ("rides_go", "users_go", "subscriptions_go")}
+    outputs = {name: directory / f"{name}.csv" for name in ("cleaned_rides", "merged", "cleaned_users")}
+
+    def clean() -> None:
+        clean_data_streaming(
+            paths["rides_go"], paths["users_go"], paths["subscriptions_go"],
+            outputs["cleaned_rides"], outputs["merged"], outputs["cleaned_users"],
+        )
+
+    # Очистка выполняется один раз до замеров, остальные функции работают с ее результатом
+    clean()
+    merged = pd.read_csv(outputs["merged"], parse_dates=["date"])
+    users = pd.read_csv(paths["users_go"])
+    with_sub = merged[merged["subscription_type"] == "ultra"]
+    no_sub = merged[merged["subscription_type"] != "ultra"]
+
+    return {
+        "clean_data_streaming": clean,
+        "read_csv(merged)": lambda: pd.read_csv(outputs["merged"], parse_dates=["date"]),
+        "print_duplicates(users)": lambda: print_duplicates(users, return_masked=False),
+        "get_total_price_by_rule(ME)": lambda: get_total_price_by_rule(merged, "ME"),
+        "get_total_price_by_rule(D)": lambda: get_total_price_by_rule(merged, "D"),
+        "build_revenue_cube": lambda: build_revenue_cube(merged),
+        "check_ttest_ind(duration)": lambda: check_ttest_ind(
+            with_sub["duration"], no_sub["duration"], alternative="greater"
+        ),
+        "batch_ttest_ind(city x month)": lambda: batch_ttest_ind(
+            merged, "duration", by=["city", merged["date"].dt.month],
+            split="subscription_type", groups=("ultra", "free"), alternative="greater",
+        ),
+    }
+
+
+def run_benchmarks(
+        scales: Iterable[int] = DEFAULT_SCALES,
+        repeat: int = 1,
+        seed: int = 0,
+        work_dir: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Замеряет время и пиковую память функций `utils` на синтетических данных разного размера.
+
+    Для каждого масштаба генерируется набор данных (`generate_dataset`), после чего
+    каждая функция выполняется `repeat` раз. Пиковая память считается через
+    `tracemalloc` и учитывает буферы NumPy/pandas.
+
+    Args:
+        scales (Iterable[int], optional): Количества поездок. По умолчанию `DEFAULT_SCALES`.
+        repeat (int, optional): Количество повторов; берется лучшее время. По умолчанию 1.
+        seed (int, optional): Зерно генератора данных. По умолчанию 0.
+        work_dir (Optional[Path], optional): Каталог для сгенерированных данных. Если None,
+            используется временный каталог, удаляемый после замеров. По умолчанию None.
+        output_path (Optional[Path], optional): CSV-файл для сохранения результатов.
+            По умолчанию None.
+
+    Returns:
+        pd.DataFrame: Колонки 'scale', 'function', 'seconds', 'peak_mb'.
+
+    Example:
+        >>> results = run_benchmarks(scales=[10_000, 1_000_000])
+        >>> results.pivot(index="function", columns="scale", values="seconds")
+    """
+    model = fit_rides_model()
+    rows = []
+    with contextlib.ExitStack() as stack:
+        if work_dir is None:
+            work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        for scale in scales:
+            directory = Path(work_dir) / str(scale)
+            generate_dataset(scale, directory, seed=seed, model=model)
+            for name, func in _cases(directory).items():
+                seconds, peak_mb = _measure(func, repeat)
+                rows.append({"scale": scale, "function": name, "seconds": seconds, "peak_mb": peak_mb})
+
+    results = pd.DataFrame(rows)
+    if output_path is not None:
+        results.to_csv(output_path, index=False)
+    return results
+
+
+def compare_benchmarks(
+        current: pd.DataFrame, baseline: pd.DataFrame, tolerance: float = 0.2
+) -> pd.DataFrame:
+    """
+    Сравнивает результаты замеров с базовыми и отмечает регрессии.
+
+    Args:
+        current (pd.DataFrame): Результаты `run_benchmarks`.
+        baseline (pd.DataFrame): Базовые результаты в том же формате.
+        tolerance (float, optional): Допустимое относительное замедление или рост
+            памяти. По умолчанию 0.2 (20%).
+
+    Returns:
+        pd.DataFrame: Для каждой пары (scale, function) — отношения времени и памяти
+        к базовым ('seconds_ratio', 'peak_mb_ratio') и флаг 'regression'.
+    """
+    merged = current.merge(baseline, on=["scale", "function"], suffixes=("", "_baseline"))
+    merged["seconds_ratio"] = merged["seconds"] / merged["seconds_baseline"]
+    merged["peak_mb_ratio"] = merged["peak_mb"] / merged["peak_mb_baseline"]
+    merged["regression"] = (merged["seconds_ratio"] > 1 + tolerance) | (
+        merged["peak_mb_ratio"] > 1 + tolerance
+    )
+    return merged[["scale", "function", "seconds_ratio", "peak_mb_ratio", "regression"]]
+
+
+def main() -> None:
+    """Точка входа: `python -m utils.benchmark --scales 10000 1000000 --output bench.csv`."""
+    parser = argparse.ArgumentParser(description="Замеры производительности utils на синтетических данных.")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=None)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.repeat, args.seed, args.work_dir, args.output)
+    print(results.pivot(index="function", columns="scale", values=["seconds", "peak_mb"]).round(3))
+
+    if args.baseline is not None:
+        comparison = compare_benchmarks(results, pd.read_csv(args.baseline))
+        print(comparison[comparison["regression"]])
+
+
+if __name__ == "__main__":
+    main()
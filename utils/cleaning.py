@@ -0,0 +1,180 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .paths import joinpath
+from .profiling import profiled
+
+# Пороги фильтрации аномальных поездок (см. DataCleaning.ipynb)
+MIN_DURATION = 1
+MIN_DISTANCE = 50
+
+
+def clean_users(users_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Удаляет полные дубликаты пользователей, оставляя первое вхождение.
+
+    Args:
+        users_df (pd.DataFrame): Данные о пользователях (`users_go.csv`).
+
+    Returns:
+        pd.DataFrame: Данные о пользователях без дубликатов.
+    """
+    return users_df.drop_duplicates(keep="first")
+
+
+def clean_rides(
+        rides_df: pd.DataFrame,
+        min_duration: float = MIN_DURATION,
+        min_distance: float = MIN_DISTANCE,
+) -> pd.DataFrame:
+    """
+    Фильтрует аномальные поездки и приводит длительность и расстояние к целым числам.
+
+    Оставляются поездки с `duration > min_duration` и `distance > min_distance`.
+    Расстояние отбрасывает дробную часть, длительность округляется вверх.
+    Все операции векторизованы и не вызывают Python-функций на каждую строку.
+
+    Args:
+        rides_df (pd.DataFrame): Данные о поездках (`rides_go.csv`) или их часть.
+        min_duration (float, optional): Порог длительности поездки в минутах.
+            По умолчанию `MIN_DURATION`.
+        min_distance (float, optional): Порог расстояния поездки в метрах.
+            По умолчанию `MIN_DISTANCE`.
+
+    Returns:
+        pd.DataFrame: Очищенные данные о поездках.
+
+    Example:
+        >>> cleaned_rides_df = clean_rides(rides_df)
+    """
+    mask = (rides_df["duration"].to_numpy() > min_duration) & (
+        rides_df["distance"].to_numpy() > min_distance
+    )
+    cleaned = rides_df.loc[mask].copy()
+    cleaned["distance"] = cleaned["distance"].to_numpy().astype(int)
+    cleaned["duration"] = np.ceil(cleaned["duration"].to_numpy()).astype(int)
+    return cleaned
+
+
+def build_user_lookup(users_df: pd.DataFrame, subscriptions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Строит справочник пользователей с тарифами подписки, индексированный по `user_id`.
+
+    Args:
+        users_df (pd.DataFrame): Очищенные данные о пользователях.
+        subscriptions_df (pd.DataFrame): Данные о подписках (`subscriptions_go.csv`).
+
+    Returns:
+        pd.DataFrame: Справочник с колонками пользователя и подписки, индекс — `user_id`.
+
+    Raises:
+        ValueError: Если после очистки `user_id` не уникален.
+    """
+    lookup = users_df.merge(subscriptions_df, on="subscription_type").set_index("user_id")
+    if not lookup.index.is_unique:
+        raise ValueError("user_id в справочнике пользователей не уникален.")
+    return lookup
+
+
+def merge_rides(rides_df: pd.DataFrame, user_lookup: pd.DataFrame) -> pd.DataFrame:
+    """
+    Присоединяет к поездкам данные пользователя и подписки по справочнику.
+
+    Эквивалентно `rides.merge(users, on="user_id").merge(subscriptions, on="subscription_type")`,
+    но выполняется через целочисленный индексатор по справочнику, поэтому подходит
+    для обработки данных частями. Поездки неизвестных пользователей отбрасываются.
+
+    Args:
+        rides_df (pd.DataFrame): Очищенные данные о поездках или их часть.
+        user_lookup (pd.DataFrame): Справочник из `build_user_lookup`.
+
+    Returns:
+        pd.DataFrame: Объединенная таблица поездок, пользователей и подписок.
+    """
+    positions = user_lookup.index.get_indexer(rides_df["user_id"])
+    found = positions >= 0
+    attributes = user_lookup.iloc[positions[found]].reset_index(drop=True)
+    rides = rides_df.loc[found].reset_index(drop=True)
+    return pd.concat([rides, attributes], axis=1)
+
+
+@profiled
+def clean_data_streaming(
+        rides_path: Optional[Path] = None,
+        users_path: Optional[Path] = None,
+        subscriptions_path: Optional[Path] = None,
+        cleaned_rides_path: Optional[Path] = None,
+        merged_path: Optional[Path] = None,
+        cleaned_users_path: Optional[Path] = None,
+        chunksize: int = 500_000,
+        min_duration: float = MIN_DURATION,
+        min_distance: float = MIN_DISTANCE,
+) -> dict[str, int]:
+    """
+    Выполняет очистку и объединение данных из DataCleaning.ipynb потоково, по частям.
+
+    Пользователи и подписки загружаются целиком (это небольшие справочники), а файл
+    поездок читается частями по `chunksize` строк. Каждая часть очищается,
+    объединяется со справочником и дописывается в выходные CSV-файлы, поэтому
+    пиковое потребление памяти не зависит от количества поездок.
+
+    Args:
+        rides_path (Optional[Path], optional): Исходный файл поездок.
+            По умолчанию `data/rides_go.csv`.
+        users_path (Optional[Path], optional): Исходный файл пользователей.
+            По умолчанию `data/users_go.csv`.
+        subscriptions_path (Optional[Path], optional): Файл подписок.
+            По умолчанию `data/subscriptions_go.csv`.
+        cleaned_rides_path (Optional[Path], optional): Куда записать очищенные поездки.
+            По умолчанию `data/cleaned_rides_go.csv`.
+        merged_path (Optional[Path], optional): Куда записать объединенную таблицу.
+            По умолчанию `data/cleaned_rides_users_subscriptions_go.csv`.
+        cleaned_users_path (Optional[Path], optional): Куда записать очищенных
+            пользователей. По умолчанию `data/cleaned_users_go.csv`.
+        chunksize (int, optional): Количество строк поездок в одной части.
+            По умолчанию 500 000.
+        min_duration (float, optional): Порог длительности поездки. По умолчанию `MIN_DURATION`.
+        min_distance (float, optional): Порог расстояния поездки. По умолчанию `MIN_DISTANCE`.
+
+    Returns:
+        dict[str, int]: Количество прочитанных поездок ('rides_read'), оставшихся после
+        очистки ('rides_cleaned') и попавших в объединенную таблицу ('rides_merged').
+
+    Example:
+        >>> clean_data_streaming(chunksize=1_000_000)
+        {'rides_read': 18068, 'rides_cleaned': 17942, 'rides_merged': 17942}
+    """
+    rides_path = rides_path or joinpath("data", "rides_go.csv")
+    users_path = users_path or joinpath("data", "users_go.csv")
+    subscriptions_path = subscriptions_path or joinpath("data", "subscriptions_go.csv")
+    cleaned_rides_path = cleaned_rides_path or joinpath("data", "cleaned_rides_go.csv")
+    merged_path = merged_path or joinpath("data", "cleaned_rides_users_subscriptions_go.csv")
+    cleaned_users_path = cleaned_users_path or joinpath("data", "cleaned_users_go.csv")
+
+    cleaned_users_df = clean_users(pd.read_csv(users_path, encoding="utf-8"))
+    cleaned_users_df.to_csv(cleaned_users_path, index=False)
+
+    subscriptions_df = pd.read_csv(subscriptions_path, encoding="utf-8")
+    user_lookup = build_user_lookup(cleaned_users_df, subscriptions_df)
+
+    counts = {"rides_read": 0, "rides_cleaned": 0, "rides_merged": 0}
+    # Дата не разбирается: в выходной файл она записывается в исходном виде
+    reader = pd.read_csv(
+        rides_path, encoding="utf-8", chunksize=chunksize, dtype={"date": str}
+    )
+    for idx, chunk in enumerate(reader):
+        cleaned_chunk = clean_rides(chunk, min_duration, min_distance)
+        merged_chunk = merge_rides(cleaned_chunk, user_lookup)
+
+        write_options = {"index": False, "mode": "w" if idx == 0 else "a", "header": idx == 0}
+        cleaned_chunk.to_csv(cleaned_rides_path, **write_options)
+        merged_chunk.to_csv(merged_path, **write_options)
+
+        counts["rides_read"] += len(chunk)
+        counts["rides_cleaned"] += len(cleaned_chunk)
+        counts["rides_merged"] += len(merged_chunk)
+
+    return counts
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .paths import joinpath
+from .profiling import profiled
+
+# Схемы файлов данных: имя колонки -> тип хранения в бинарном кэше.
+# "category" означает строковую колонку, которая хранится как коды + словарь.
+RIDES_SCHEMA = {
+    "user_id": "int64",
+    "distance": "float64",
+    "duration": "float64",
+    "date": "datetime64[ns]",
+}
+
+USERS_SCHEMA = {
+    "user_id": "int64",
+    "name": "category",
+    "age": "int64",
+    "city": "category",
+    "subscription_type": "category",
+}
+
+SUBSCRIPTIONS_SCHEMA = {
+    "subscription_type": "category",
+    "minute_price": "int64",
+    "start_ride_price": "int64",
+    "subscription_fee": "int64",
+}
+
+RIDES_USERS_SUBSCRIPTIONS_SCHEMA = {
+    **RIDES_SCHEMA,
+    **{col: dtype for col, dtype in USERS_SCHEMA.items() if col != "user_id"},
+    **{col: dtype for col, dtype in SUBSCRIPTIONS_SCHEMA.items() if col != "subscription_type"},
+}
+
+SCHEMAS: dict[str, dict[str, str]] = {
+    "rides_go.csv": RIDES_SCHEMA,
+    "users_go.csv": USERS_SCHEMA,
+    "subscriptions_go.csv": SUBSCRIPTIONS_SCHEMA,
+    "cleaned_rides_go.csv": RIDES_SCHEMA,
+    "cleaned_users_go.csv": USERS_SCHEMA,
+    "cleaned_rides_users_subscriptions_go.csv": RIDES_USERS_SUBSCRIPTIONS_SCHEMA,
+}
+
+CACHE_DIR = joinpath("data", ".cache")
+
+_META_FILE = "meta.json"
+
+
+def _file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Считает SHA-256 содержимого файла, читая его блоками."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_fingerprint(path: Path, check: str) -> dict:
+    """Собирает отпечаток исходного файла для проверки актуальности кэша."""
+    stat = path.stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if check == "hash":
+        fingerprint["sha256"] = _file_hash(path)
+    return fingerprint
+
+
+def _is_fresh(meta: dict, path: Path, check: str, meta_path: Path) -> bool:
+    """
+    Проверяет, соответствует ли кэш текущему состоянию исходного файла.
+
+    В режиме 'hash' содержимое хешируется, только если изменилось время
+    изменения файла. Если хеш совпал, новое время записывается в `meta_path`,
+    чтобы следующие проверки снова обходились без чтения файла.
+    """
+    source = meta.get("source", {})
+    stat = path.stat()
+    if source.get("size") != stat.st_size:
+        return False
+    if check == "hash" and "sha256" not in source:
+        return False
+    if source.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if check == "hash" and source["sha256"] == _file_hash(path):
+        source["mtime_ns"] = stat.st_mtime_ns
+        with open(meta_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False)
+        return True
+    return False
+
+
+def _write_cache(df: pd.DataFrame, schema: dict[str, str], cache_path: Path, source: dict) -> None:
+    """Записывает колонки DataFrame в виде .npy-файлов и метаданные схемы."""
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    categories = {}
+    for col, dtype in schema.items():
+        if dtype == "category":
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            values = codes.astype(np.int32)
+            categories[col] = [None if pd.isna(v) else v for v in uniques]
+        elif dtype.startswith("datetime64"):
+            values = df[col].to_numpy(dtype=dtype).view("int64")
+        else:
+            values = df[col].to_numpy(dtype=dtype)
+        np.save(tmp_path / f"{col}.npy", np.ascontiguousarray(values))
+
+    meta = {
+        "source": source,
+        "rows": len(df),
+        "schema": schema,
+        "categories": categories,
+    }
+    with open(tmp_path / _META_FILE, "w", encoding="utf-8") as file:
+        json.dump(meta, file, ensure_ascii=False)
+
+    shutil.rmtree(cache_path, ignore_errors=True)
+    os.replace(tmp_path, cache_path)
+
+
+def _read_cache(
+        cache_path: Path,
+        meta: dict,
+        columns: list[str],
+        as_category: bool,
+) -> pd.DataFrame:
+    """Собирает DataFrame из memory-mapped колонок кэша без разбора текста."""
+    data = {}
+    for col in columns:
+        dtype = meta["schema"][col]
+        # Копирование при записи: колонки можно изменять, файлы кэша остаются нетронутыми
+        values = np.load(cache_path / f"{col}.npy", mmap_mode="c")
+        if dtype == "category":
+            categorical = pd.Categorical.from_codes(
+                np.asarray(values), categories=pd.Index(meta["categories"][col])
+            )
+            data[col] = categorical if as_category else np.asarray(categorical, dtype=object)
+        elif dtype.startswith("datetime64"):
+            data[col] = values.view(dtype)
+        else:
+            data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _read_csv(path: Path, schema: dict[str, str], as_category: bool) -> pd.DataFrame:
+    """Читает CSV-файл с явными типами из схемы."""
+    dtypes = {
+        col: (object if dtype == "category" and not as_category else dtype)
+        for col, dtype in schema.items()
+        if not dtype.startswith("datetime64")
+    }
+    dates = [col for col, dtype in schema.items() if dtype.startswith("datetime64")]
+    return pd.read_csv(path, encoding="utf-8", dtype=dtypes, parse_dates=dates)
+
+
+@profiled
+def load_data(
+        filename: str,
+        columns: Optional[list[str]] = None,
+        as_category: bool = False,
+        check: str = "mtime",
+        use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Загружает файл данных GoFast с учетом схемы, используя бинарный колоночный кэш.
+
+    При первом вызове CSV-файл разбирается по схеме из `SCHEMAS`, а каждая колонка
+    сохраняется в `data/.cache/<имя файла>/` в виде отдельного .npy-файла.
+    Последующие вызовы читают колонки через memory-map без повторного разбора текста.
+    Кэш пересобирается, если исходный файл изменился.
+
+    Args:
+        filename (str): Имя файла в каталоге `data`, например 'rides_go.csv'.
+            Должно присутствовать в `SCHEMAS`.
+        columns (Optional[list[str]], optional): Список колонок для чтения. Если None,
+            читаются все колонки схемы. По умолчанию None.
+        as_category (bool, optional): Если True, строковые колонки возвращаются с типом
+            'category', иначе как 'object'. По умолчанию False.
+        check (str, optional): Способ проверки актуальности кэша: 'mtime' (размер и время
+            изменения файла) или 'hash' (SHA-256 содержимого; файл хешируется, только если
+            изменилось время изменения). По умолчанию 'mtime'.
+        use_cache (bool, optional): Если False, файл читается напрямую из CSV без кэша.
+            По умолчанию True.
+
+    Returns:
+        pd.DataFrame: Данные с типами согласно схеме.
+
+    Raises:
+        KeyError: Если для файла нет схемы или запрошены неизвестные колонки.
+        ValueError: Если передан неизвестный способ проверки `check`.
+
+    Example:
+        >>> rides_df = load_data("cleaned_rides_users_subscriptions_go.csv")
+        >>> durations = load_data("rides_go.csv", columns=["user_id", "duration"])
+    """
+    if filename not in SCHEMAS:
+        raise KeyError(f"Нет схемы для файла: {filename}")
+    if check not in ("mtime", "hash"):
+        raise ValueError(f"Неизвестный способ проверки кэша: {check}")
+
+    schema = SCHEMAS[filename]
+    columns = list(schema) if columns is None else list(columns)
+    unknown = [col for col in columns if col not in schema]
+    if unknown:
+        raise KeyError(f"Колонки отсутствуют в схеме {filename}: {unknown}")
+
+    source_path = joinpath("data", filename)
+
+    if not use_cache:
+        return _read_csv(source_path, schema, as_category)[columns]
+
+    cache_path = CACHE_DIR / filename
+    meta_path = cache_path / _META_FILE
+
+    meta = None
+    if meta_path.exists():
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("schema") != schema or not _is_fresh(meta, source_path, check, meta_path):
+            meta = None
+
+    if meta is None:
+        df = _read_csv(source_path, schema, as_category=False)
+        _write_cache(df, schema, cache_path, _source_fingerprint(source_path, check))
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+
+    return _read_cache(cache_path, meta, columns, as_category)
@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .loader import load_data
+
+
+@dataclass(frozen=True)
+class RidesModel:
+    """
+    Нормализованная модель данных GoFast (звезда): поездки, пользователи, подписки.
+
+    В отличие от объединенной таблицы `cleaned_rides_users_subscriptions_go.csv`,
+    атрибуты пользователя и тарифы не повторяются в каждой строке поездки.
+    Поездки хранят только `user_id` (int32), пользователи и подписки — компактные
+    справочники с категориальными колонками. Атрибуты пользователя и подписки
+    разворачиваются до уровня поездок только по запросу (`column`, `frame`)
+    через целочисленные массивы позиций и `take`.
+
+    Attributes:
+        rides (pd.DataFrame): 'user_id' (int32), 'distance', 'duration' (float32), 'date'.
+        users (pd.DataFrame): Справочник пользователей, отсортированный по 'user_id':
+            'user_id' (int32), 'name', 'city', 'subscription_type' (category), 'age' (int8)
+            и 'subscription_pos' (int8) — позиция тарифа в `subscriptions`.
+        subscriptions (pd.DataFrame): Справочник тарифов: 'subscription_type' (category),
+            'minute_price', 'start_ride_price', 'subscription_fee'.
+
+    Example:
+        >>> model = RidesModel.load()
+        >>> ultra = model.segment(subscription_type="ultra")
+        >>> get_total_price_by_rule(ultra, "ME")
+    """
+
+    rides: pd.DataFrame
+    users: pd.DataFrame
+    subscriptions: pd.DataFrame
+
+    @classmethod
+    def from_frames(
+            cls,
+            rides_df: pd.DataFrame,
+            users_df: pd.DataFrame,
+            subscriptions_df: pd.DataFrame,
+    ) -> "RidesModel":
+        """
+        Строит модель из таблиц поездок, пользователей и подписок.
+
+        Args:
+            rides_df (pd.DataFrame): Очищенные поездки ('user_id', 'distance', 'duration', 'date').
+            users_df (pd.DataFrame): Очищенные пользователи (без дубликатов `user_id`).
+                Пользователи, тип подписки которых отсутствует в `subscriptions_df`,
+                отбрасываются вместе с поездками.
+            subscriptions_df (pd.DataFrame): Тарифы подписок.
+
+        Returns:
+            RidesModel: Нормализованная модель.
+
+        Raises:
+            ValueError: Если `user_id` в справочнике пользователей не уникален.
+        """
+        subscriptions = subscriptions_df.reset_index(drop=True).copy()
+        subscriptions["subscription_type"] = subscriptions["subscription_type"].astype("category")
+
+        users = users_df.sort_values("user_id").reset_index(drop=True)
+        if not users["user_id"].is_unique:
+            raise ValueError("user_id в справочнике пользователей не уникален.")
+
+        # Как и merge в DataCleaning.ipynb, пользователи с неизвестным типом подписки
+        # отбрасываются вместе с поездками: get_indexer возвращает для них -1
+        subscription_pos = pd.Index(subscriptions["subscription_type"].astype(object)).get_indexer(
+            users["subscription_type"]
+        )
+        known = subscription_pos >= 0
+        users = users[known]
+        users = pd.DataFrame(
+            {
+                "user_id": users["user_id"].to_numpy(dtype=np.int32),
+                "name": users["name"].astype("category"),
+                "age": users["age"].to_numpy(dtype=np.int8),
+                "city": users["city"].astype("category"),
+                "subscription_type": users["subscription_type"].astype("category"),
+                "subscription_pos": subscription_pos[known].astype(np.int8),
+            }
+        )
+
+        # Как и merge в DataCleaning.ipynb, поездки неизвестных пользователей отбрасываются
+        rides_df = rides_df[rides_df["user_id"].isin(users["user_id"])]
+        rides = pd.DataFrame(
+            {
+                "user_id": rides_df["user_id"].to_numpy(dtype=np.int32),
+                "distance": rides_df["distance"].to_numpy(dtype=np.float32),
+                "duration": rides_df["duration"].to_numpy(dtype=np.float32),
+                "date": rides_df["date"].to_numpy(),
+            }
+        )
+        return cls(rides=rides, users=users, subscriptions=subscriptions)
+
+    @classmethod
+    def from_merged(cls, df: pd.DataFrame) -> "RidesModel":
+        """Строит модель из объединенной таблицы поездок, пользователей и подписок."""
+        users_df = df[["user_id", "name", "age", "city", "subscription_type"]].drop_duplicates("user_id")
+        subscriptions_df = df[
+            ["subscription_type", "minute_price", "start_ride_price", "subscription_fee"]
+        ].drop_duplicates("subscription_type")
+        return cls.from_frames(df[["user_id", "distance", "duration", "date"]], users_df, subscriptions_df)
+
+    @classmethod
+    def load(cls) -> "RidesModel":
+        """Загружает модель из очищенных файлов проекта через бинарный кэш `load_data`."""
+        return cls.from_frames(
+            load_data("cleaned_rides_go.csv"),
+            load_data("cleaned_users_go.csv"),
+            load_data("subscriptions_go.csv"),
+        )
+
+    @cached_property
+    def user_positions(self) -> np.ndarray:
+        """Позиции пользователей каждой поездки в справочнике `users` (int32)."""
+        positions = np.searchsorted(self.users["user_id"].to_numpy(), self.rides["user_id"].to_numpy())
+        return positions.astype(np.int32)
+
+    def column(self, name: str) -> Union[np.ndarray, pd.Categorical]:
+        """
+        Возвращает колонку на уровне поездок, разворачивая атрибуты по запросу.
+
+        Args:
+            name (str): Колонка поездок, пользователя или подписки.
+
+        Returns:
+            Union[np.ndarray, pd.Categorical]: Значения колонки для каждой поездки.
+
+        Raises:
+            KeyError: Если колонки нет ни в одном справочнике.
+        """
+        if name in self.rides.columns:
+            return self.rides[name].to_numpy()
+        if name in self.users.columns:
+            return self.users[name].array.take(self.user_positions)
+        if name in self.subscriptions.columns:
+            subscription_positions = self.users["subscription_pos"].to_numpy()[self.user_positions]
+            return self.subscriptions[name].array.take(subscription_positions)
+        raise KeyError(f"Колонка отсутствует в модели: {name}")
+
+    def frame(self, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Собирает DataFrame на уровне поездок только из нужных колонок.
+
+        Args:
+            columns (Optional[list[str]], optional): Колонки результата. Если None,
+                возвращается полная объединенная таблица. По умолчанию None.
+
+        Returns:
+            pd.DataFrame: Таблица поездок с развернутыми атрибутами.
+        """
+        if columns is None:
+            columns = [
+                *self.rides.columns,
+                *(col for col in self.users.columns if col not in ("user_id", "subscription_pos")),
+                *(col for col in self.subscriptions.columns if col != "subscription_type"),
+            ]
+        return pd.DataFrame({col: self.column(col) for col in columns}, index=self.rides.index)
+
+    def filter(self, mask: np.ndarray) -> "RidesModel":
+        """Возвращает модель с поездками, отобранными булевой маской; справочники общие."""
+        return RidesModel(
+            rides=self.rides.loc[np.asarray(mask)].reset_index(drop=True),
+            users=self.users,
+            subscriptions=self.subscriptions,
+        )
+
+    def segment(self, **filters: Union[str, int, list]) -> "RidesModel":
+        """
+        Отбирает поездки по атрибутам пользователя или подписки.
+
+        Маска строится по небольшому справочнику пользователей и переносится
+        на поездки одной операцией индексирования.
+
+        Args:
+            **filters: Значение или список значений для колонок `users` или
+                `subscriptions`, например `subscription_type="ultra"`, `city=["Омск"]`.
+
+        Returns:
+            RidesModel: Модель с отобранными поездками.
+
+        Example:
+            >>> users_with_sub = model.segment(subscription_type="ultra")
+            >>> users_no_sub = model.segment(subscription_type="free")
+        """
+        user_mask = np.ones(len(self.users), dtype=bool)
+        for name, values in filters.items():
+            values = values if isinstance(values, list) else [values]
+            if name in self.users.columns:
+                user_mask &= self.users[name].isin(values).to_numpy()
+            elif name in self.subscriptions.columns:
+                allowed = np.flatnonzero(self.subscriptions[name].isin(values).to_numpy())
+                user_mask &= np.isin(self.users["subscription_pos"].to_numpy(), allowed)
+            else:
+                raise KeyError(f"Колонка отсутствует в справочниках: {name}")
+        return self.filter(user_mask[self.user_positions])
+
+    def memory_usage(self) -> int:
+        """Возвращает объем памяти модели в байтах (включая строки категорий)."""
+        return int(
+            sum(frame.memory_usage(index=True, deep=True).sum()
+                for frame in (self.rides, self.users, self.subscriptions))
+        )
@@ -1,7 +1,14 @@
-from typing import Optional, Union
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
 import pandas as pd
 
+from .profiling import profiled
+
 
+@profiled
 def print_shape_data(df: pd.DataFrame) -> None:
     """
     Выводит информацию о размере DataFrame.
@@ -24,6 +31,7 @@ def print_shape_data(df: pd.DataFrame) -> None:
     print("Количество строк данных: {}\nКоличество столбцов: {}".format(*df.shape))
 
 
+@profiled
 def print_duplicates(
         df: pd.DataFrame,
         subset: Optional[Union[list[str], str]] = None,
@@ -75,6 +83,7 @@ def print_duplicates(
     return None
 
 
+@profiled
 def print_categorical_data(df: pd.DataFrame) -> None:
     """
     Анализирует и выводит информацию о категориальных столбцах DataFrame.
@@ -127,4 +136,246 @@ def print_categorical_data(df: pd.DataFrame) -> None:
         print("- Уникальных значений:", df[col].nunique(dropna=False))
         print(f"- Топ 10 по количество:")
         print(df[col].value_counts(dropna=False).head(10))
-        print()
\ No newline at end of file
+        print()
+
+
+# Запись буфера хешей строк: хеш и глобальный номер строки
+_HASH_RECORD = np.dtype([("hash", np.uint64), ("position", np.int64)])
+
+
+def _iter_chunks(data: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterable[pd.DataFrame]:
+    """Возвращает итератор частей данных: DataFrame считается одной частью."""
+    return [data] if isinstance(data, pd.DataFrame) else data
+
+
+def _duplicate_positions(records: np.ndarray) -> np.ndarray:
+    """Находит номера строк, хеш которых уже встречался в строке с меньшим номером."""
+    # Записи уже упорядочены по номеру строки, поэтому достаточно устойчивой сортировки по хешу
+    order = np.argsort(records["hash"], kind="stable")
+    hashes, positions = records["hash"][order], records["position"][order]
+    repeated = np.zeros(records.size, dtype=bool)
+    repeated[1:] = hashes[1:] == hashes[:-1]
+    return positions[repeated]
+
+
+@profiled
+def find_duplicates_streaming(
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        subset: Optional[Union[list[str], str]] = None,
+        max_memory_rows: int = 10_000_000,
+        spill_dir: Optional[Path] = None,
+        n_partitions: int = 64,
+) -> dict:
+    """
+    Находит дубликаты строк в данных, которые не помещаются в оперативную память.
+
+    Каждая строка (или набор колонок `subset`) заменяется 64-битным хешем
+    (`pd.util.hash_pandas_object`). Пока хешей не больше `max_memory_rows`,
+    они хранятся в памяти; дальше они сбрасываются на диск в `n_partitions`
+    файлов по старшим битам хеша, и каждый файл затем проверяется отдельно.
+    Результат совпадает с `df.duplicated(subset=subset, keep="first")` с точностью
+    до коллизий 64-битного хеша.
+
+    Note:
+        Типы колонок должны совпадать во всех частях (например, задайте `dtype`
+        в `pd.read_csv`), иначе одинаковые значения могут получить разные хеши.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame или итератор его частей,
+            например `pd.read_csv(path, chunksize=1_000_000)`.
+        subset (Optional[Union[list[str], str]], optional): Колонки для проверки дубликатов.
+            Если None, проверяются все колонки. По умолчанию None.
+        max_memory_rows (int, optional): Сколько хешей держать в памяти до сброса на диск.
+            По умолчанию 10 000 000 (~160 МБ).
+        spill_dir (Optional[Path], optional): Каталог для временных файлов. По умолчанию
+            системный временный каталог.
+        n_partitions (int, optional): Количество файлов-разделов при сбросе на диск,
+            степень двойки от 2 до 2**16. По умолчанию 64.
+
+    Returns:
+        dict: 'rows' — количество строк, 'duplicates' — количество дубликатов,
+        'positions' — отсортированные номера строк-дубликатов (с нуля, сквозная нумерация).
+
+    Raises:
+        ValueError: Если `n_partitions` не является степенью двойки от 2 до 2**16.
+
+    Example:
+        >>> chunks = pd.read_csv(joinpath("data", "users_go.csv"), chunksize=500)
+        >>> find_duplicates_streaming(chunks)["duplicates"]
+        31
+    """
+    if isinstance(subset, str):
+        subset = [subset]
+    # Раздел задается старшими битами хеша, поэтому количество разделов — степень двойки
+    if not 2 <= n_partitions <= 2**16 or n_partitions & (n_partitions - 1):
+        raise ValueError(f"Количество разделов должно быть степенью двойки от 2 до 65536: {n_partitions}")
+    shift = np.uint64(64 - (n_partitions.bit_length() - 1))
+
+    buffers: list[np.ndarray] = []
+    buffered = 0
+    rows = 0
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp_dir:
+        spill_paths: Optional[list[Path]] = None
+
+        def spill() -> None:
+            records = np.concatenate(buffers)
+            partitions = (records["hash"] >> shift).astype(np.int64)
+            order = np.argsort(partitions, kind="stable")
+            bounds = np.searchsorted(partitions[order], np.arange(n_partitions + 1))
+            for idx, path in enumerate(spill_paths):
+                with open(path, "ab") as file:
+                    records[order[bounds[idx]:bounds[idx + 1]]].tofile(file)
+            buffers.clear()
+
+        for chunk in _iter_chunks(data):
+            hashes = pd.util.hash_pandas_object(
+                chunk if subset is None else chunk[subset], index=False
+            ).to_numpy()
+            records = np.empty(hashes.size, dtype=_HASH_RECORD)
+            records["hash"] = hashes
+            records["position"] = np.arange(rows, rows + hashes.size)
+            buffers.append(records)
+            rows += hashes.size
+            buffered += hashes.size
+
+            if buffered > max_memory_rows:
+                if spill_paths is None:
+                    spill_paths = [Path(tmp_dir) / f"part_{idx}.bin" for idx in range(n_partitions)]
+                spill()
+                buffered = 0
+
+        if spill_paths is None:
+            positions = _duplicate_positions(
+                np.concatenate(buffers) if buffers else np.empty(0, _HASH_RECORD)
+            )
+        else:
+            if buffers:
+                spill()
+            positions = np.concatenate(
+                [_duplicate_positions(np.fromfile(path, dtype=_HASH_RECORD)) for path in spill_paths]
+            )
+
+    positions.sort()
+    return {"rows": rows, "duplicates": int(positions.size), "positions": positions}
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Векторно считает количество значащих бит в uint64."""
+    values = values.copy()
+    length = np.zeros(values.size, dtype=np.int64)
+    for step in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(step))
+        length[mask] += step
+        values[mask] >>= np.uint64(step)
+    return length + (values > 0)
+
+
+def _hll_update(registers: np.ndarray, hashes: np.ndarray, precision: int) -> None:
+    """Обновляет регистры HyperLogLog хешами значений."""
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rest = hashes & ((np.uint64(1) << np.uint64(64 - precision)) - np.uint64(1))
+    rank = (64 - precision) - _bit_length(rest) + 1
+    np.maximum.at(registers, index, rank.astype(registers.dtype))
+
+
+def _hll_estimate(registers: np.ndarray) -> int:
+    """Оценивает количество уникальных значений по регистрам HyperLogLog."""
+    m = registers.size
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m**2 / np.sum(2.0 ** -registers.astype(float))
+    zeros = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+def _space_saving_update(summary: pd.Series, counts: pd.Series, capacity: int) -> tuple[pd.Series, int]:
+    """Объединяет сводку частых значений с частотами новой части, оставляя `capacity` значений."""
+    merged = summary.add(counts, fill_value=0)
+    if merged.size <= capacity:
+        return merged, 0
+    merged = merged.sort_values(ascending=False, kind="stable")
+    return merged.iloc[:capacity], int(merged.iloc[capacity])
+
+
+@profiled
+def profile_categorical_streaming(
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        columns: Optional[list[str]] = None,
+        exact: bool = True,
+        top: int = 10,
+        precision: int = 14,
+        capacity: int = 1_000,
+) -> dict[str, dict]:
+    """
+    Профилирует категориальные колонки за один проход по данным, переданным частями.
+
+    Потоковая версия `print_categorical_data`: все колонки обрабатываются
+    в одном проходе, а результат возвращается, а не печатается.
+
+    В точном режиме частоты всех значений суммируются по частям (память
+    пропорциональна числу уникальных значений). В приближенном режиме количество
+    уникальных значений оценивается HyperLogLog (2**precision регистров,
+    относительная ошибка ~1.04 / sqrt(2**precision)), а частые значения —
+    объединяемой сводкой Space-Saving/Misra–Gries на `capacity` значений: частоты
+    в ней занижены не более чем на 'max_error'.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame или итератор его частей.
+        columns (Optional[list[str]], optional): Колонки для анализа. Если None, берутся
+            колонки типа 'object' первой части. По умолчанию None.
+        exact (bool, optional): Точный (True) или приближенный (False) подсчет.
+            По умолчанию True.
+        top (int, optional): Сколько самых частых значений вернуть. По умолчанию 10.
+        precision (int, optional): Точность HyperLogLog (4..18). По умолчанию 14.
+        capacity (int, optional): Размер сводки частых значений в приближенном режиме.
+            По умолчанию 1000.
+
+    Returns:
+        dict[str, dict]: Для каждой колонки: 'rows' — количество строк, 'nunique' —
+        количество уникальных значений (с учетом NaN), 'top' — Series частот самых
+        частых значений, 'max_error' — максимальная ошибка частот (0 в точном режиме).
+
+    Example:
+        >>> chunks = pd.read_csv(joinpath("data", "users_go.csv"), chunksize=500)
+        >>> profile = profile_categorical_streaming(chunks, exact=False)
+        >>> profile["city"]["top"]
+    """
+    state: dict[str, dict] = {}
+    for chunk in _iter_chunks(data):
+        if columns is None:
+            columns = list(chunk.select_dtypes(include="object").columns)
+        for col in columns:
+            col_state = state.setdefault(
+                col,
+                {
+                    "rows": 0,
+                    "counts": pd.Series(dtype=float),
+                    "registers": np.zeros(2**precision, dtype=np.uint8),
+                    "max_error": 0,
+                },
+            )
+            col_state["rows"] += len(chunk)
+            counts = chunk[col].value_counts(dropna=False)
+            if exact:
+                col_state["counts"] = col_state["counts"].add(counts, fill_value=0)
+            else:
+                hashes = pd.util.hash_pandas_object(
+                    pd.Series(counts.index), index=False
+                ).to_numpy()
+                _hll_update(col_state["registers"], hashes, precision)
+                col_state["counts"], dropped = _space_saving_update(
+                    col_state["counts"], counts, capacity
+                )
+                col_state["max_error"] += dropped
+
+    profile = {}
+    for col, col_state in state.items():
+        counts = col_state["counts"].astype(np.int64).sort_values(ascending=False, kind="stable")
+        profile[col] = {
+            "rows": col_state["rows"],
+            "nunique": int(counts.size) if exact else _hll_estimate(col_state["registers"]),
+            "top": counts.head(top).rename(col),
+            "max_error": col_state["max_error"],
+        }
+    return profile
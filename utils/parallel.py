@@ -0,0 +1,275 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .revenue import ADDITIVE_AGGREGATIONS, REVENUE_AGGREGATIONS, total_price_from_aggregates
+
+# Способы разбиения поездок на части для процессов пула
+PARTITIONS = ("user_id", "date")
+
+# Описание колонки в разделяемой памяти: имя блока, тип и длина массива
+ColumnSpec = tuple[str, str, int]
+
+
+class SharedColumns:
+    """
+    Колонки NumPy в блоках `multiprocessing.shared_memory`.
+
+    Процессы пула получают только описания блоков (`spec`) и подключаются к ним
+    без копирования и сериализации данных. Блоки освобождаются при выходе из
+    контекста.
+
+    Example:
+        >>> with SharedColumns({"duration": durations}) as shared:
+        ...     executor.submit(kernel, shared.spec, 0, durations.size)
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], order: Optional[np.ndarray] = None):
+        """
+        Args:
+            columns (dict[str, np.ndarray]): Одномерные колонки одинаковой длины.
+            order (Optional[np.ndarray], optional): Перестановка строк, в порядке которой
+                колонки записываются в разделяемую память. По умолчанию None.
+        """
+        self._blocks = []
+        self.spec: dict[str, ColumnSpec] = {}
+        try:
+            for name, values in columns.items():
+                values = np.asarray(values)
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self._blocks.append(block)
+                target = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+                if order is None:
+                    target[:] = values
+                else:
+                    np.take(values, order, out=target)
+                self.spec[name] = (block.name, values.dtype.str, values.size)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Закрывает и удаляет блоки разделяемой памяти."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedColumns":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _attach(spec: dict[str, ColumnSpec]) -> tuple[dict[str, np.ndarray], list]:
+    """Подключается к колонкам в разделяемой памяти внутри процесса пула."""
+    blocks, arrays = [], {}
+    for name, (block_name, dtype, size) in spec.items():
+        # Блоки принадлежат родительскому процессу, трекер ресурсов не должен их удалять
+        block = shared_memory.SharedMemory(name=block_name, track=False)
+        blocks.append(block)
+        arrays[name] = np.ndarray((size,), dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def _detach(blocks: list) -> None:
+    """Отключается от блоков разделяемой памяти."""
+    for block in blocks:
+        block.close()
+
+
+def partition_bounds(keys: np.ndarray, n_parts: int) -> list[tuple[int, int]]:
+    """
+    Делит отсортированный массив ключей на части примерно равного размера.
+
+    Границы частей не разрывают группы одинаковых ключей, поэтому при разбиении
+    по `user_id` каждый пользователь целиком попадает в одну часть.
+
+    Args:
+        keys (np.ndarray): Отсортированные ключи строк.
+        n_parts (int): Желаемое количество частей.
+
+    Returns:
+        list[tuple[int, int]]: Непустые полуинтервалы строк [start, stop).
+    """
+    targets = np.linspace(0, keys.size, n_parts + 1)[1:-1].astype(np.int64)
+    cuts = np.searchsorted(keys, keys[np.minimum(targets, keys.size - 1)], side="left") if keys.size else []
+    bounds = np.unique(np.concatenate([[0], cuts, [keys.size]]))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _sort_order(keys: np.ndarray) -> Optional[np.ndarray]:
+    """Возвращает перестановку для сортировки ключей или None, если они уже отсортированы."""
+    if keys.size < 2 or np.all(keys[1:] >= keys[:-1]):
+        return None
+    return np.argsort(keys, kind="stable")
+
+
+def _revenue_part(
+        arrays: dict[str, np.ndarray], start: int, stop: int, first: int, last: int, rule: str
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Считает аддитивные агрегаты и пары (период, пользователь) по части поездок.
+
+    Интервалы `resample` зависят от первой и последней даты данных, поэтому к части
+    добавляются две служебные строки с датами `first` и `last`. Периоды считает сам
+    pandas, и они совпадают с последовательным расчетом (включая конец дня у 'ME'
+    и 'W'), а пустые значения служебных строк не попадают в агрегаты.
+    """
+    dates = np.concatenate([[first], arrays["date"][start:stop], [last]]).view("datetime64[ns]")
+    df = pd.DataFrame(
+        {col: np.concatenate([[np.nan], arrays[col][start:stop], [np.nan]]) for col in ADDITIVE_AGGREGATIONS},
+        index=pd.DatetimeIndex(dates, name="date"),
+    )
+    df["user_id"] = np.concatenate([[-1], arrays["user_id"][start:stop], [-1]])
+    df["rides"] = np.concatenate([[0], np.ones(stop - start, dtype=np.int64), [0]])
+
+    sums = df.resample(rule).aggregate({**ADDITIVE_AGGREGATIONS, "rides": "sum"})
+    sums = sums[sums["rides"] > 0].drop(columns="rides")
+    pairs = df.groupby([pd.Grouper(freq=rule), "user_id"]).size().index.to_frame(index=False)
+    return sums, pairs[pairs["user_id"] >= 0]
+
+
+def _moments_part(values: np.ndarray) -> tuple[int, float, float]:
+    """Считает количество, среднее и сумму квадратов отклонений по части выборки."""
+    if values.size == 0:
+        return 0, 0.0, 0.0
+    mean = values.mean()
+    return values.size, float(mean), float(((values - mean) ** 2).sum())
+
+
+def _revenue_kernel(
+        spec: dict[str, ColumnSpec], start: int, stop: int, first: int, last: int, rule: str
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Задача пула: агрегаты выручки по строкам [start, stop) из разделяемой памяти."""
+    arrays, blocks = _attach(spec)
+    try:
+        return _revenue_part(arrays, start, stop, first, last, rule)
+    finally:
+        # Представления массивов должны быть освобождены до закрытия блоков
+        del arrays
+        _detach(blocks)
+
+
+def _moments_kernel(spec: dict[str, ColumnSpec], column: str, start: int, stop: int) -> tuple[int, float, float]:
+    """Задача пула: моменты колонки по строкам [start, stop) из разделяемой памяти."""
+    arrays, blocks = _attach(spec)
+    try:
+        return _moments_part(arrays[column][start:stop])
+    finally:
+        del arrays
+        _detach(blocks)
+
+
+def _merge_moments(parts: list[tuple[int, float, float]]) -> tuple[int, float, float]:
+    """Объединяет частичные моменты по формуле Чана для параллельной дисперсии."""
+    n, mean, m2 = 0, 0.0, 0.0
+    for n_part, mean_part, m2_part in parts:
+        if n_part == 0:
+            continue
+        total = n + n_part
+        delta = mean_part - mean
+        mean += delta * n_part / total
+        m2 += m2_part + delta ** 2 * n * n_part / total
+        n = total
+    return n, mean, m2
+
+
+def _n_jobs(n_jobs: Optional[int]) -> int:
+    """Приводит `n_jobs` к количеству процессов (None — все ядра)."""
+    return max(1, n_jobs or os.cpu_count() or 1)
+
+
+def parallel_total_price(
+        df: pd.DataFrame,
+        rule: str = "ME",
+        n_jobs: Optional[int] = None,
+        partition: str = "user_id",
+) -> pd.Series:
+    """
+    Считает выручку по периодам, как `get_total_price_by_rule`, в пуле процессов.
+
+    Поездки сортируются по ключу `partition`, записываются в разделяемую память и
+    делятся на непрерывные части. Каждый процесс считает по своей части суммы,
+    максимумы тарифов и пары (период, пользователь). Суммы складываются, а число
+    уникальных пользователей за период считается по объединению пар, поэтому
+    результат точно совпадает с последовательным расчетом при любом разбиении.
+
+    Args:
+        df (pd.DataFrame): Поездки с колонками 'date', 'minute_price', 'duration',
+            'start_ride_price', 'user_id', 'subscription_fee'.
+        rule (str, optional): Правило ресемплинга. По умолчанию 'ME'.
+        n_jobs (Optional[int], optional): Количество процессов. Если None, используются
+            все ядра. По умолчанию None.
+        partition (str, optional): Ключ разбиения: 'user_id' или 'date'. По умолчанию 'user_id'.
+
+    Returns:
+        pd.Series: Серия 'total_price', индексированная периодом.
+
+    Raises:
+        ValueError: Если передан неизвестный способ разбиения.
+
+    Example:
+        >>> parallel_total_price(rides_df, "ME", n_jobs=8)
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"Неизвестный способ разбиения: {partition}")
+
+    if df.empty:
+        return total_price_from_aggregates(df.resample(rule, on="date").aggregate(REVENUE_AGGREGATIONS))
+
+    n_jobs = _n_jobs(n_jobs)
+    columns = {"date": df["date"].to_numpy(dtype="datetime64[ns]").view("int64")}
+    columns.update({col: df[col].to_numpy() for col in (*ADDITIVE_AGGREGATIONS, "user_id")})
+    keys = columns[partition]
+    order = _sort_order(keys)
+    if order is not None:
+        keys = keys[order]
+    first, last = int(columns["date"].min()), int(columns["date"].max())
+
+    with SharedColumns(columns, order) as shared:
+        bounds = partition_bounds(keys, n_jobs)
+        arguments = [(shared.spec, start, stop, first, last, rule) for start, stop in bounds]
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(bounds))) as executor:
+            results = list(executor.map(_revenue_kernel, *zip(*arguments)))
+
+    sums = pd.concat([part for part, _ in results]).groupby(level=0).aggregate(ADDITIVE_AGGREGATIONS)
+    users = pd.concat([part for _, part in results]).drop_duplicates()["date"].value_counts()
+    sums["user_id"] = users.reindex(sums.index).to_numpy()
+    # Пустые периоды между метками заполняются так же, как в последовательном resample
+    sums = sums.resample(rule).aggregate({**ADDITIVE_AGGREGATIONS, "user_id": "sum"})
+    return total_price_from_aggregates(sums)
+
+
+def parallel_moments(values: pd.Series, n_jobs: Optional[int] = None) -> tuple[int, float, float]:
+    """
+    Считает объем, среднее и несмещенную дисперсию выборки в пуле процессов.
+
+    Args:
+        values (pd.Series): Числовая выборка.
+        n_jobs (Optional[int], optional): Количество процессов. Если None, используются
+            все ядра. По умолчанию None.
+
+    Returns:
+        tuple[int, float, float]: (n, mean, var) с `ddof=1`.
+
+    Example:
+        >>> n, mean, var = parallel_moments(users_with_sub["duration"], n_jobs=8)
+    """
+    n_jobs = _n_jobs(n_jobs)
+    values = np.asarray(values, dtype=np.float64)
+    step = -(-values.size // n_jobs) or 1
+    bounds = [(start, min(start + step, values.size)) for start in range(0, values.size, step)]
+
+    with SharedColumns({"values": values}) as shared:
+        arguments = [(shared.spec, "values", start, stop) for start, stop in bounds]
+        with ProcessPoolExecutor(max_workers=max(1, min(n_jobs, len(bounds)))) as executor:
+            parts = list(executor.map(_moments_kernel, *zip(*arguments))) if arguments else []
+
+    n, mean, m2 = _merge_moments(parts)
+    return n, mean, (m2 / (n - 1) if n > 1 else np.nan)
@@ -0,0 +1,386 @@
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+import pandas as pd
+import scipy.stats as stats
+
+from .EDA import get_total_price_by_rule, split_by_subscription
+from .cleaning import MIN_DISTANCE, MIN_DURATION, build_user_lookup, clean_rides, clean_users, merge_rides
+from .loader import CACHE_DIR, SCHEMAS, _file_hash, _read_csv, _source_fingerprint
+from .paths import joinpath
+from .vizualization import FigureSpec, export_figures
+
+PIPELINE_CACHE_DIR = CACHE_DIR / "pipeline"
+
+# Параметры по умолчанию: пороги и гипотезы из DataCleaning.ipynb и EDA.ipynb
+DEFAULT_PARAMS = {
+    "data_dir": str(joinpath("data")),
+    "check": "hash",
+    "min_duration": MIN_DURATION,
+    "min_distance": MIN_DISTANCE,
+    "rule": "ME",
+    "with_sub": "ultra",
+    "popmean": 3130,
+    "alpha": 0.05,
+    "figures_dir": str(joinpath("reports", "figures")),
+    "formats": ("png",),
+    "n_jobs": 1,
+}
+
+_RAW_FILES = ("users_go.csv", "rides_go.csv", "subscriptions_go.csv")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    Этап конвейера.
+
+    Attributes:
+        name (str): Имя этапа.
+        func (Callable): Функция `func(params, *inputs)`, возвращающая результат этапа.
+        inputs (tuple[str, ...]): Этапы, результаты которых передаются в `func`.
+        params (tuple[str, ...]): Параметры конвейера, от которых зависит результат.
+        sources (tuple[str, ...]): Файлы из `data_dir`, читаемые этапом напрямую.
+        modules (tuple[str, ...]): Модули пакета `utils`, код которых вызывает этап.
+            Их исходный код входит в ключ кэша вместе с кодом `func`.
+        artifacts (bool): Если True, `func` возвращает список путей к файлам. В кэш
+            сохраняется словарь {путь: SHA-256 содержимого}, и кэш считается
+            актуальным, только пока все файлы существуют и не изменились.
+    """
+
+    name: str
+    func: Callable
+    inputs: tuple[str, ...] = ()
+    params: tuple[str, ...] = ()
+    sources: tuple[str, ...] = ()
+    modules: tuple[str, ...] = ()
+    artifacts: bool = False
+
+
+def _load(params: dict) -> dict[str, pd.DataFrame]:
+    """Читает исходные CSV-файлы по схемам `loader`."""
+    data_dir = Path(params["data_dir"])
+    return {name: _read_csv(data_dir / name, SCHEMAS[name], as_category=False) for name in _RAW_FILES}
+
+
+def _validate(params: dict, raw: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Проверяет колонки исходных файлов и собирает сводку о пропусках и дубликатах."""
+    rows = []
+    for name, df in raw.items():
+        missing = [col for col in SCHEMAS[name] if col not in df.columns]
+        if missing:
+            raise ValueError(f"В файле {name} отсутствуют колонки: {missing}")
+        rows.append(
+            {
+                "file": name,
+                "rows": len(df),
+                "nulls": int(df.isna().sum().sum()),
+                "duplicates": int(df.duplicated().sum()),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _clean(params: dict, raw: dict[str, pd.DataFrame], report: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Удаляет дубликаты пользователей и аномальные поездки."""
+    return {
+        "users": clean_users(raw["users_go.csv"]),
+        "rides": clean_rides(raw["rides_go.csv"], params["min_duration"], params["min_distance"]),
+    }
+
+
+def _merge(params: dict, cleaned: dict[str, pd.DataFrame], raw: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Объединяет поездки, пользователей и подписки."""
+    user_lookup = build_user_lookup(cleaned["users"], raw["subscriptions_go.csv"])
+    return merge_rides(cleaned["rides"], user_lookup)
+
+
+def _revenue(params: dict, merged: pd.DataFrame) -> pd.DataFrame:
+    """Считает выручку по периодам для пользователей с подпиской и без нее."""
+    with_sub, no_sub = split_by_subscription(merged, params["with_sub"])
+    return pd.DataFrame(
+        {
+            "with_sub": get_total_price_by_rule(with_sub, params["rule"], params["n_jobs"]),
+            "no_sub": get_total_price_by_rule(no_sub, params["rule"], params["n_jobs"]),
+        }
+    )
+
+
+def _tests(params: dict, merged: pd.DataFrame, revenue: pd.DataFrame) -> pd.DataFrame:
+    """Проверяет гипотезы из EDA.ipynb и возвращает таблицу результатов."""
+    with_sub, no_sub = split_by_subscription(merged, params["with_sub"])
+    results = {
+        "duration: with_sub > no_sub": stats.ttest_ind(
+            with_sub["duration"], no_sub["duration"], alternative="greater", equal_var=False
+        ),
+        f"distance < {params['popmean']}": stats.ttest_1samp(
+            merged["distance"], params["popmean"], alternative="less"
+        ),
+        "revenue: with_sub > no_sub": stats.ttest_ind(
+            revenue["with_sub"].dropna(), revenue["no_sub"].dropna(), alternative="greater", equal_var=False
+        ),
+    }
+    table = pd.DataFrame(
+        {
+            "hypothesis": list(results),
+            "statistic": [result.statistic for result in results.values()],
+            "pvalue": [result.pvalue for result in results.values()],
+        }
+    )
+    table["reject"] = table["pvalue"] < params["alpha"]
+    return table
+
+
+def _figures(params: dict, merged: pd.DataFrame) -> list[Path]:
+    """Сохраняет графики распределений и зависимости длительности от расстояния."""
+    numeric = list(merged.select_dtypes(exclude=["object"]).columns.drop(["user_id", "date"]))
+    specs = [
+        FigureSpec("hist_boxplot", merged, {"columns": numeric, "hue": "subscription_type"}, "distributions"),
+        FigureSpec(
+            "scatterplot", merged,
+            {"x": "distance", "ys": ["duration"], "hue": "subscription_type"}, "duration_distance",
+        ),
+    ]
+    paths = export_figures(specs, Path(params["figures_dir"]), tuple(params["formats"]), params["n_jobs"])
+    return [path for figure_paths in paths for path in figure_paths]
+
+
+# clean зависит от validate, чтобы не очищать данные, не прошедшие проверку
+STAGES = (
+    Stage("load", _load, params=("data_dir",), sources=_RAW_FILES, modules=("loader",)),
+    Stage("validate", _validate, inputs=("load",), modules=("loader",)),
+    Stage(
+        "clean", _clean, inputs=("load", "validate"), params=("min_duration", "min_distance"),
+        modules=("cleaning",),
+    ),
+    Stage("merge", _merge, inputs=("clean", "load"), modules=("cleaning",)),
+    Stage(
+        "revenue", _revenue, inputs=("merge",), params=("rule", "with_sub"),
+        modules=("EDA", "revenue", "parallel"),
+    ),
+    Stage("tests", _tests, inputs=("merge", "revenue"), params=("with_sub", "popmean", "alpha"), modules=("EDA",)),
+    Stage(
+        "figures", _figures, inputs=("merge",), params=("figures_dir", "formats"),
+        modules=("vizualization", "overview", "loader"), artifacts=True,
+    ),
+)
+
+
+@lru_cache(maxsize=None)
+def _module_hash(name: str) -> str:
+    """Считает SHA-256 исходного файла модуля пакета `utils`."""
+    return _file_hash(Path(importlib.import_module(f".{name}", __package__).__file__))
+
+
+def _normalize_param(value: Any) -> Any:
+    """Приводит числа к float, чтобы 50 и 50.0 давали одинаковый ключ кэша."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _source_key(path: Path, check: str) -> dict:
+    """
+    Отпечаток исходного файла для ключа кэша.
+
+    В режиме 'hash' ключ зависит только от содержимого (размер и SHA-256), поэтому
+    изменение времени файла без изменения данных не перезапускает этапы.
+    """
+    fingerprint = _source_fingerprint(path, check)
+    if check == "hash":
+        fingerprint.pop("mtime_ns")
+    return fingerprint
+
+
+def _stage_key(stage: Stage, params: dict, input_keys: list[str]) -> str:
+    """Считает ключ кэша этапа по коду этапа и его модулей, параметрам, входам и исходным файлам."""
+    data_dir = Path(params["data_dir"])
+    payload = {
+        "stage": stage.name,
+        "code": hashlib.sha256(inspect.getsource(stage.func).encode()).hexdigest(),
+        "modules": {name: _module_hash(name) for name in stage.modules},
+        "params": {name: _normalize_param(params[name]) for name in stage.params},
+        "inputs": input_keys,
+        "sources": {
+            name: _source_key(data_dir / name, params["check"]) for name in stage.sources
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _write_output(value: Any, path: Path) -> None:
+    """Сохраняет результат этапа через временный файл."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _read_output(path: Path) -> Any:
+    """Читает сохраненный результат этапа."""
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def _artifact_hashes(paths: list[Path]) -> dict[str, str]:
+    """Считает SHA-256 файлов, созданных этапом."""
+    return {str(path): _file_hash(Path(path)) for path in paths}
+
+
+def _is_cached(stage: Stage, path: Path) -> bool:
+    """Проверяет, есть ли актуальный результат этапа на диске."""
+    if not path.exists():
+        return False
+    if not stage.artifacts:
+        return True
+    # Файлы с фиксированными именами мог перезаписать запуск с другими параметрами
+    artifacts = _read_output(path)
+    return all(Path(p).exists() and _file_hash(Path(p)) == digest for p, digest in artifacts.items())
+
+
+def _dependencies(stages: dict[str, Stage], name: str) -> set[str]:
+    """Возвращает этап и все этапы, от которых он зависит."""
+    result = {name}
+    for dependency in stages[name].inputs:
+        result |= _dependencies(stages, dependency)
+    return result
+
+
+def run_pipeline(
+        params: Optional[dict] = None,
+        until: Optional[str] = None,
+        force: Iterable[str] = (),
+        cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Выполняет конвейер DataChecking → DataCleaning → EDA с кэшированием этапов.
+
+    Этапы образуют граф: load → validate → clean → merge → revenue → tests, figures.
+    Результат каждого этапа сохраняется в `cache_dir` под ключом — хешем кода
+    этапа и исходных файлов вызываемых им модулей, его параметров, ключей
+    входных этапов и отпечатков исходных файлов данных.
+    Если ключ не изменился, этап не выполняется, а его результат читается с диска
+    только при необходимости пересчитать зависимый этап. Поэтому изменение,
+    например, `min_distance` перезапускает clean и последующие этапы, а load и
+    validate берутся из кэша.
+
+    Args:
+        params (Optional[dict], optional): Параметры, переопределяющие `DEFAULT_PARAMS`.
+            По умолчанию None.
+        until (Optional[str], optional): Последний выполняемый этап (вместе с его
+            зависимостями). По умолчанию выполняются все этапы.
+        force (Iterable[str], optional): Этапы, которые нужно пересчитать без учета
+            кэша. По умолчанию ().
+        cache_dir (Optional[Path], optional): Каталог кэша. По умолчанию `PIPELINE_CACHE_DIR`.
+
+    Returns:
+        pd.DataFrame: По строке на этап: 'stage', 'status' ('cached' или 'run'),
+        'seconds', 'path' (файл с результатом этапа).
+
+    Raises:
+        KeyError: Если передан неизвестный параметр или этап.
+
+    Example:
+        >>> report = run_pipeline({"min_distance": 100})
+        >>> read_stage_output(report, "tests")
+    """
+    unknown = set(params or {}) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise KeyError(f"Неизвестные параметры конвейера: {sorted(unknown)}")
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    cache_dir = Path(cache_dir or PIPELINE_CACHE_DIR)
+    stages = {stage.name: stage for stage in STAGES}
+    force = set(force)
+    for name in {until, *force} - {None}:
+        if name not in stages:
+            raise KeyError(f"Неизвестный этап конвейера: {name}")
+
+    needed = set(stages) if until is None else _dependencies(stages, until)
+    keys, paths, outputs, rows = {}, {}, {}, []
+
+    def output(name: str) -> Any:
+        if name not in outputs:
+            outputs[name] = _read_output(paths[name])
+        return outputs[name]
+
+    for stage in STAGES:
+        if stage.name not in needed:
+            continue
+        start = time.perf_counter()
+        keys[stage.name] = _stage_key(stage, params, [keys[name] for name in stage.inputs])
+        paths[stage.name] = cache_dir / f"{stage.name}-{keys[stage.name]}.pkl"
+
+        if stage.name not in force and _is_cached(stage, paths[stage.name]):
+            status = "cached"
+        else:
+            outputs[stage.name] = stage.func(params, *(output(name) for name in stage.inputs))
+            if stage.artifacts:
+                outputs[stage.name] = _artifact_hashes(outputs[stage.name])
+            _write_output(outputs[stage.name], paths[stage.name])
+            status = "run"
+        rows.append(
+            {
+                "stage": stage.name,
+                "status": status,
+                "seconds": time.perf_counter() - start,
+                "path": paths[stage.name],
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def read_stage_output(report: pd.DataFrame, stage: str) -> Any:
+    """
+    Читает результат этапа из отчета `run_pipeline`.
+
+    Raises:
+        KeyError: Если этап не выполнялся в этом запуске.
+    """
+    rows = report.loc[report["stage"] == stage, "path"]
+    if rows.empty:
+        raise KeyError(f"Этап отсутствует в отчете: {stage}")
+    return _read_output(rows.iloc[0])
+
+
+def main() -> None:
+    """Точка входа: `gofast-pipeline --min-distance 100` или `python -m utils.pipeline`."""
+    parser = argparse.ArgumentParser(description="Конвейер GoFast: проверка, очистка, EDA.")
+    parser.add_argument("--data-dir", default=DEFAULT_PARAMS["data_dir"])
+    parser.add_argument("--check", choices=("mtime", "hash"), default=DEFAULT_PARAMS["check"])
+    parser.add_argument("--min-duration", type=float, default=DEFAULT_PARAMS["min_duration"])
+    parser.add_argument("--min-distance", type=float, default=DEFAULT_PARAMS["min_distance"])
+    parser.add_argument("--rule", default=DEFAULT_PARAMS["rule"])
+    parser.add_argument("--with-sub", default=DEFAULT_PARAMS["with_sub"])
+    parser.add_argument("--popmean", type=float, default=DEFAULT_PARAMS["popmean"])
+    parser.add_argument("--alpha", type=float, default=DEFAULT_PARAMS["alpha"])
+    parser.add_argument("--figures-dir", default=DEFAULT_PARAMS["figures_dir"])
+    parser.add_argument("--formats", nargs="+", default=list(DEFAULT_PARAMS["formats"]))
+    parser.add_argument("--n-jobs", type=int, default=DEFAULT_PARAMS["n_jobs"])
+    parser.add_argument("--until", choices=[stage.name for stage in STAGES], default=None)
+    parser.add_argument("--force", nargs="*", choices=[stage.name for stage in STAGES], default=[])
+    parser.add_argument("--cache-dir", type=Path, default=None)
+    args = vars(parser.parse_args())
+
+    until, force, cache_dir = args.pop("until"), args.pop("force"), args.pop("cache_dir")
+    args["formats"] = tuple(args["formats"])
+    report = run_pipeline(args, until=until, force=force, cache_dir=cache_dir)
+    print(report[["stage", "status", "seconds"]].to_string(index=False))
+
+    if "tests" in set(report["stage"]):
+        print()
+        print(read_stage_output(report, "tests").to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
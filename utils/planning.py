@@ -0,0 +1,157 @@
+from typing import Union
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+ArrayLike = Union[float, int, list, np.ndarray, pd.Series]
+
+
+def _broadcast(grid: bool, **params: ArrayLike) -> dict[str, np.ndarray]:
+    """Приводит параметры к одномерным массивам одной длины (или к их декартову произведению)."""
+    if grid:
+        index = pd.MultiIndex.from_product(
+            [np.atleast_1d(value) for value in params.values()], names=list(params)
+        )
+        return {name: index.get_level_values(name).to_numpy() for name in params}
+    arrays = np.broadcast_arrays(*(np.atleast_1d(value) for value in params.values()))
+    return {name: array.ravel() for name, array in zip(params, arrays)}
+
+
+def binom_min_trials(
+        k: ArrayLike,
+        p: ArrayLike,
+        alpha: ArrayLike,
+        grid: bool = False,
+) -> pd.DataFrame:
+    """
+    Находит минимальное число испытаний n, при котором P(X < k) <= alpha для X ~ Binom(n, p).
+
+    Заменяет линейный поиск `while stats.binom.cdf(k - 1, n, p) > alpha: n += 1`
+    из EDA.ipynb (задача о промокодах). Сначала n оценивается нормальной
+    аппроксимацией с поправкой на непрерывность, затем границы поиска уточняются
+    и точное n находится бисекцией по `stats.binom.cdf`. Все сценарии
+    обрабатываются одновременно, число вызовов scipy — O(log n), а не O(n).
+
+    Args:
+        k (ArrayLike): Целевое количество успехов (например, продлений подписки).
+        p (ArrayLike): Вероятность успеха в одном испытании.
+        alpha (ArrayLike): Допустимая вероятность не достичь `k` успехов.
+        grid (bool, optional): Если True, перебираются все комбинации значений
+            (декартово произведение), иначе параметры транслируются по правилам
+            NumPy. По умолчанию False.
+
+    Returns:
+        pd.DataFrame: Колонки 'k', 'p', 'alpha', 'n' (минимальное число испытаний)
+        и 'prob_fail' (точная вероятность P(X < k) при найденном n).
+
+    Raises:
+        ValueError: Если k < 1, p вне (0, 1] или alpha вне (0, 1).
+
+    Example:
+        >>> binom_min_trials(k=100, p=0.1, alpha=0.05)
+             k    p  alpha     n  prob_fail
+        0  100  0.1   0.05  1161   0.049761
+        >>> plan = binom_min_trials(k=[50, 100, 200], p=[0.05, 0.1], alpha=0.05, grid=True)
+    """
+    params = _broadcast(grid, k=k, p=p, alpha=alpha)
+    k, p, alpha = params["k"].astype(np.int64), params["p"].astype(float), params["alpha"].astype(float)
+
+    if np.any(k < 1):
+        raise ValueError("k должно быть не меньше 1.")
+    if np.any((p <= 0) | (p > 1)):
+        raise ValueError("p должно лежать в интервале (0, 1].")
+    if np.any((alpha <= 0) | (alpha >= 1)):
+        raise ValueError("alpha должно лежать в интервале (0, 1).")
+
+    def is_enough(n: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        return stats.binom.cdf(k[mask] - 1, n[mask], p[mask]) <= alpha[mask]
+
+    # Нормальная аппроксимация: (k - 0.5 - n*p) / sqrt(n*p*q) = z_alpha, решаем относительно sqrt(n)
+    z = stats.norm.ppf(alpha)
+    spread = z * np.sqrt(p * (1 - p))
+    root = (-spread + np.sqrt(spread**2 + 4 * p * (k - 0.5))) / (2 * p)
+    estimate = np.ceil(root**2).astype(np.int64)
+
+    # lo — всегда недостаточное n, hi — всегда достаточное
+    lo = np.maximum(k - 1, (estimate * 0.9).astype(np.int64))
+    hi = np.maximum(k, (estimate * 1.1).astype(np.int64) + 1)
+
+    everyone = np.ones(k.size, dtype=bool)
+    lo_enough = is_enough(lo, everyone)
+    lo[lo_enough] = k[lo_enough] - 1
+
+    while True:
+        hi_short = ~is_enough(hi, everyone)
+        if not hi_short.any():
+            break
+        lo[hi_short] = hi[hi_short]
+        hi[hi_short] *= 2
+
+    while True:
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        enough = np.zeros(k.size, dtype=bool)
+        enough[active] = is_enough(mid, active)
+        hi = np.where(active & enough, mid, hi)
+        lo = np.where(active & ~enough, mid, lo)
+
+    return pd.DataFrame(
+        {
+            "k": k,
+            "p": p,
+            "alpha": alpha,
+            "n": hi,
+            "prob_fail": stats.binom.cdf(k - 1, hi, p),
+        }
+    )
+
+
+def binom_cdf_normal(
+        n: ArrayLike,
+        p: ArrayLike,
+        k: ArrayLike,
+        grid: bool = False,
+) -> pd.DataFrame:
+    """
+    Оценивает P(X <= k) для X ~ Binom(n, p) нормальной аппроксимацией и точно.
+
+    Обобщает расчет из EDA.ipynb (задача о push-уведомлениях) на сетку сценариев:
+    нормальная аппроксимация с поправкой на непрерывность считается векторно
+    вместе с точным значением `stats.binom.cdf` для контроля точности.
+
+    Args:
+        n (ArrayLike): Количество испытаний (например, отправленных уведомлений).
+        p (ArrayLike): Вероятность успеха (например, открытия уведомления).
+        k (ArrayLike): Порог количества успехов.
+        grid (bool, optional): Если True, перебираются все комбинации значений.
+            По умолчанию False.
+
+    Returns:
+        pd.DataFrame: Колонки 'n', 'p', 'k', 'mu', 'sigma', 'prob_normal'
+        (аппроксимация) и 'prob_exact' (точная вероятность).
+
+    Example:
+        >>> binom_cdf_normal(n=1_000_000, p=0.4, k=399_500)
+    """
+    params = _broadcast(grid, n=n, p=p, k=k)
+    n, p, k = params["n"].astype(np.int64), params["p"].astype(float), params["k"].astype(np.int64)
+
+    mu = n * p
+    sigma = np.sqrt(n * p * (1 - p))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob_normal = stats.norm.cdf((k + 0.5 - mu) / sigma)
+
+    return pd.DataFrame(
+        {
+            "n": n,
+            "p": p,
+            "k": k,
+            "mu": mu,
+            "sigma": sigma,
+            "prob_normal": prob_normal,
+            "prob_exact": stats.binom.cdf(k, n, p),
+        }
+    )
@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+
+# Профилирование выключено по умолчанию: обернутые функции в этом случае
+# выполняют только одну проверку флага перед вызовом
+_enabled = False
+_records: list[dict] = []
+_local = threading.local()
+
+
+def _input_rows(args: tuple, kwargs: dict) -> Optional[int]:
+    """Возвращает количество строк первого DataFrame/Series среди аргументов вызова."""
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+    return None
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Декоратор, записывающий метрики вызова функции, когда профилирование включено.
+
+    Для каждого вызова внутри `profiling()` сохраняются время выполнения (wall и CPU),
+    пиковый прирост памяти (если `tracemalloc` активен) и количество строк входного
+    DataFrame. Вне `profiling()` функция вызывается напрямую.
+
+    Args:
+        func (Callable): Профилируемая функция.
+
+    Returns:
+        Callable: Обернутая функция с теми же именем и документацией.
+
+    Example:
+        >>> @profiled
+        ... def heavy(df):
+        ...     return df.groupby("city").size()
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        frame = {"peak": current}
+        stack.append(frame)
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            stack.pop()
+            peak_bytes = None
+            if tracing:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - current
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            _records.append(
+                {
+                    "function": f"{func.__module__}.{func.__qualname__}",
+                    "start": start_wall,
+                    "wall_s": wall,
+                    "cpu_s": cpu,
+                    "peak_bytes": peak_bytes,
+                    "rows": _input_rows(args, kwargs),
+                    "depth": len(stack),
+                    "thread": threading.get_ident(),
+                }
+            )
+
+    return wrapper
+
+
+@contextmanager
+def profiling(trace_memory: bool = True, reset: bool = True) -> Iterator[None]:
+    """
+    Включает сбор метрик для функций, помеченных `profiled`.
+
+    Args:
+        trace_memory (bool, optional): Если True, на время блока запускается
+            `tracemalloc` для замера пиковой памяти. Замедляет код с большим
+            количеством мелких аллокаций. По умолчанию True.
+        reset (bool, optional): Если True, ранее собранные записи удаляются.
+            По умолчанию True.
+
+    Example:
+        >>> with profiling():
+        ...     get_total_price_by_rule(rides_df, "ME")
+        >>> profile_stats()
+    """
+    global _enabled
+    if reset:
+        reset_profile()
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    previous, _enabled = _enabled, True
+    try:
+        yield
+    finally:
+        _enabled = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def reset_profile() -> None:
+    """Удаляет все собранные записи профилирования."""
+    _records.clear()
+
+
+def profile_records() -> pd.DataFrame:
+    """
+    Возвращает собранные записи по каждому вызову.
+
+    Returns:
+        pd.DataFrame: Колонки 'function', 'start', 'wall_s', 'cpu_s', 'peak_bytes',
+        'rows', 'depth', 'thread'.
+    """
+    return pd.DataFrame(
+        _records,
+        columns=["function", "start", "wall_s", "cpu_s", "peak_bytes", "rows", "depth", "thread"],
+    )
+
+
+def profile_stats() -> pd.DataFrame:
+    """
+    Агрегирует записи профилирования по функциям.
+
+    Returns:
+        pd.DataFrame: По строке на функцию: 'calls', 'wall_total_s', 'wall_mean_s',
+        'cpu_total_s', 'peak_max_mb', 'rows_total'; отсортировано по 'wall_total_s'.
+
+    Example:
+        >>> with profiling():
+        ...     hist_boxplot(rides_df, ["duration"], show=False)
+        >>> profile_stats()
+    """
+    records = profile_records()
+    stats = records.groupby("function").agg(
+        calls=("wall_s", "size"),
+        wall_total_s=("wall_s", "sum"),
+        wall_mean_s=("wall_s", "mean"),
+        cpu_total_s=("cpu_s", "sum"),
+        peak_max_mb=("peak_bytes", "max"),
+        rows_total=("rows", "sum"),
+    )
+    stats["peak_max_mb"] = stats["peak_max_mb"] / 2**20
+    return stats.sort_values("wall_total_s", ascending=False)
+
+
+def export_trace(path: Path) -> None:
+    """
+    Сохраняет записи профилирования в JSON в формате Chrome Trace Event.
+
+    Файл открывается в `chrome://tracing` или https://ui.perfetto.dev.
+
+    Args:
+        path (Path): Путь к JSON-файлу.
+    """
+    events = [
+        {
+            "name": record["function"],
+            "ph": "X",
+            "ts": record["start"] * 1e6,
+            "dur": record["wall_s"] * 1e6,
+            "pid": 0,
+            "tid": record["thread"],
+            "args": {
+                "cpu_s": record["cpu_s"],
+                "peak_bytes": record["peak_bytes"],
+                "rows": record["rows"],
+            },
+        }
+        for record in _records
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events}, file)
@@ -0,0 +1,226 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Количество ресемплов в одной задаче пула. Задачи получают собственные
+# зерна из SeedSequence, поэтому результат не зависит от числа процессов.
+TASK_SIZE = 1_000
+
+# Бюджет памяти на матрицы индексов и значений по умолчанию, в байтах
+MEMORY_BUDGET = 256 * 2**20
+
+# Верхняя граница размера одной пачки: большие матрицы не помещаются в кэш
+# процессора и считаются медленнее, чем несколько пачек поменьше
+MAX_BATCH_BYTES = 16 * 2**20
+
+
+def _batch_size(n_values: int, memory_budget: int, n_jobs: int) -> int:
+    """Подбирает число ресемплов в пачке так, чтобы уложиться в бюджет памяти."""
+    # На каждый элемент пачки приходится индекс (int64) и значение (float64)
+    bytes_per_resample = max(n_values, 1) * 16
+    budget = min(memory_budget // n_jobs, MAX_BATCH_BYTES)
+    return int(max(1, min(TASK_SIZE, budget // bytes_per_resample)))
+
+
+def _bootstrap_task(
+        x: np.ndarray,
+        y: Optional[np.ndarray],
+        statistic: Callable,
+        n_resamples: int,
+        seed: np.random.SeedSequence,
+        batch_size: int,
+) -> np.ndarray:
+    """Считает статистику на `n_resamples` бутстреп-выборках пачками индексов."""
+    # Отдельные потоки для каждой выборки: результат не зависит от размера пачки
+    rng_x, rng_y = (np.random.default_rng(child) for child in seed.spawn(2))
+    result = np.empty(n_resamples)
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        values = statistic(x[rng_x.integers(0, x.size, size=(size, x.size))], axis=1)
+        if y is not None:
+            values = values - statistic(y[rng_y.integers(0, y.size, size=(size, y.size))], axis=1)
+        result[start:start + size] = values
+    return result
+
+
+def _permutation_task(
+        x: np.ndarray,
+        y: np.ndarray,
+        statistic: Callable,
+        n_resamples: int,
+        seed: np.random.SeedSequence,
+        batch_size: int,
+) -> np.ndarray:
+    """Считает разность статистик на `n_resamples` перестановках пачками индексов."""
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate([x, y])
+    result = np.empty(n_resamples)
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        permutations = rng.permuted(np.tile(np.arange(pooled.size), (size, 1)), axis=1)
+        resampled = pooled[permutations]
+        result[start:start + size] = statistic(resampled[:, :x.size], axis=1) - statistic(
+            resampled[:, x.size:], axis=1
+        )
+    return result
+
+
+def _run_tasks(
+        task: Callable,
+        x: np.ndarray,
+        y: Optional[np.ndarray],
+        statistic: Callable,
+        n_resamples: int,
+        seed: Optional[int],
+        n_jobs: Optional[int],
+        memory_budget: int,
+) -> np.ndarray:
+    """Делит ресемплы на задачи с независимыми зернами и выполняет их в пуле процессов."""
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_values = x.size + (0 if y is None else y.size)
+    batch_size = _batch_size(n_values, memory_budget, n_jobs)
+
+    sizes = [min(TASK_SIZE, n_resamples - start) for start in range(0, n_resamples, TASK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [(x, y, statistic, size, task_seed, batch_size) for size, task_seed in zip(sizes, seeds)]
+
+    if n_jobs == 1 or len(arguments) == 1:
+        return np.concatenate([task(*args) for args in arguments])
+
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(arguments))) as executor:
+        return np.concatenate(list(executor.map(task, *zip(*arguments))))
+
+
+def bootstrap_ci(
+        sample1: pd.Series,
+        sample2: Optional[pd.Series] = None,
+        statistic: Callable = np.mean,
+        n_resamples: int = 10_000,
+        confidence_level: float = 0.95,
+        seed: Optional[int] = None,
+        n_jobs: Optional[int] = None,
+        memory_budget: int = MEMORY_BUDGET,
+) -> pd.DataFrame:
+    """
+    Строит бутстреп-доверительный интервал (перцентильный метод) для статистики.
+
+    Для одной выборки оценивается `statistic(sample1)`, для двух — разность
+    `statistic(sample1) - statistic(sample2)` при независимом ресемплинге выборок.
+    Ресемплы генерируются пачками матриц индексов NumPy и распределяются по пулу
+    процессов. Результат воспроизводим при фиксированном `seed` и не зависит от `n_jobs`.
+
+    Args:
+        sample1 (pd.Series): Первая выборка.
+        sample2 (Optional[pd.Series], optional): Вторая выборка. По умолчанию None.
+        statistic (Callable, optional): Векторизованная статистика с параметром `axis`
+            (например, `np.mean` или `np.median`). Должна быть доступна для pickle.
+            По умолчанию `np.mean`.
+        n_resamples (int, optional): Количество бутстреп-выборок. По умолчанию 10 000.
+        confidence_level (float, optional): Уровень доверия. По умолчанию 0.95.
+        seed (Optional[int], optional): Зерно генератора. По умолчанию None.
+        n_jobs (Optional[int], optional): Количество процессов. Если None, используются
+            все ядра; 1 — расчет в текущем процессе. По умолчанию None.
+        memory_budget (int, optional): Ограничение памяти под матрицы ресемплов
+            на все процессы, в байтах. По умолчанию `MEMORY_BUDGET`.
+
+    Returns:
+        pd.DataFrame: Одна строка с колонками 'statistic', 'ci_low', 'ci_high',
+        'confidence_level', 'n_resamples'.
+
+    Example:
+        >>> bootstrap_ci(users_with_sub["duration"], users_no_sub["duration"], seed=42)
+    """
+    x = np.asarray(sample1, dtype=float)
+    y = None if sample2 is None else np.asarray(sample2, dtype=float)
+
+    observed = statistic(x) - (0 if y is None else statistic(y))
+    distribution = _run_tasks(
+        _bootstrap_task, x, y, statistic, n_resamples, seed, n_jobs, memory_budget
+    )
+    tail = (1 - confidence_level) / 2
+    ci_low, ci_high = np.quantile(distribution, [tail, 1 - tail])
+
+    return pd.DataFrame(
+        {
+            "statistic": [observed],
+            "ci_low": [ci_low],
+            "ci_high": [ci_high],
+            "confidence_level": [confidence_level],
+            "n_resamples": [n_resamples],
+        }
+    )
+
+
+def permutation_test(
+        sample1: pd.Series,
+        sample2: pd.Series,
+        alternative: str = "two-sided",
+        statistic: Callable = np.mean,
+        n_resamples: int = 10_000,
+        _alpha: float = 0.05,
+        seed: Optional[int] = None,
+        n_jobs: Optional[int] = None,
+        memory_budget: int = MEMORY_BUDGET,
+) -> pd.DataFrame:
+    """
+    Выполняет перестановочный тест для двух независимых выборок.
+
+    Статистика теста — разность `statistic(sample1) - statistic(sample2)`.
+    Не требует нормальности и подходит для малых выборок (например, 12 месяцев
+    выручки) и скошенных распределений длительности поездок.
+
+    Args:
+        sample1 (pd.Series): Первая выборка.
+        sample2 (pd.Series): Вторая выборка.
+        alternative (str, optional): 'two-sided', 'less' (статистика первой выборки
+            меньше) или 'greater' (больше). По умолчанию 'two-sided'.
+        statistic (Callable, optional): Векторизованная статистика с параметром `axis`.
+            По умолчанию `np.mean`.
+        n_resamples (int, optional): Количество перестановок. По умолчанию 10 000.
+        _alpha (float, optional): Уровень значимости. По умолчанию 0.05.
+        seed (Optional[int], optional): Зерно генератора. По умолчанию None.
+        n_jobs (Optional[int], optional): Количество процессов. По умолчанию None (все ядра).
+        memory_budget (int, optional): Ограничение памяти под матрицы перестановок,
+            в байтах. По умолчанию `MEMORY_BUDGET`.
+
+    Returns:
+        pd.DataFrame: Одна строка с колонками 'statistic', 'pvalue', 'reject',
+        'n_resamples'.
+
+    Raises:
+        ValueError: Если передана неизвестная альтернативная гипотеза.
+
+    Example:
+        >>> permutation_test(total_price_with_sub, total_price_no_sub,
+        ...                  alternative="greater", seed=42)
+    """
+    if alternative not in ("two-sided", "less", "greater"):
+        raise ValueError(f"Неизвестная альтернативная гипотеза: {alternative}")
+
+    x = np.asarray(sample1, dtype=float)
+    y = np.asarray(sample2, dtype=float)
+
+    observed = statistic(x) - statistic(y)
+    distribution = _run_tasks(
+        _permutation_task, x, y, statistic, n_resamples, seed, n_jobs, memory_budget
+    )
+
+    if alternative == "greater":
+        extreme = np.count_nonzero(distribution >= observed)
+    elif alternative == "less":
+        extreme = np.count_nonzero(distribution <= observed)
+    else:
+        extreme = np.count_nonzero(np.abs(distribution) >= abs(observed))
+    pvalue = (extreme + 1) / (n_resamples + 1)
+
+    return pd.DataFrame(
+        {
+            "statistic": [observed],
+            "pvalue": [pvalue],
+            "reject": [pvalue < _alpha],
+            "n_resamples": [n_resamples],
+        }
+    )
@@ -0,0 +1,203 @@
+import pickle
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Агрегаты, из которых по формуле выручки собирается `total_price`
+REVENUE_AGGREGATIONS = {
+    "minute_price": "max",
+    "duration": "sum",
+    "start_ride_price": "sum",
+    "user_id": "nunique",  # NOQA
+    "subscription_fee": "max",
+}
+
+# Агрегаты, которые точно объединяются по частям (без уникальных пользователей)
+ADDITIVE_AGGREGATIONS = {
+    "minute_price": "max",
+    "duration": "sum",
+    "start_ride_price": "sum",
+    "subscription_fee": "max",
+}
+
+# Агрегатор хранит состояние по дням, поэтому периоды должны состоять из целых суток
+_DAY = pd.Timedelta(days=1)
+
+
+def total_price_from_aggregates(df: pd.DataFrame) -> pd.Series:
+    """
+    Считает выручку по уже агрегированным за период показателям.
+
+    Args:
+        df (pd.DataFrame): Агрегаты за периоды с колонками 'minute_price',
+            'duration', 'start_ride_price', 'user_id' (число уникальных
+            пользователей) и 'subscription_fee'.
+
+    Returns:
+        pd.Series: Серия 'total_price' с тем же индексом, что и у `df`.
+
+    Formula:
+        total_price = (max(minute_price) * sum(duration)) +
+                      sum(start_ride_price) +
+                      (max(subscription_fee) * nunique(user_id))
+    """
+    total_price = (
+        df["minute_price"] * df["duration"]
+        + df["start_ride_price"]
+        + df["subscription_fee"] * df["user_id"]
+    )
+    return total_price.rename("total_price")
+
+
+def _check_daily_rule(rule: str) -> None:
+    """
+    Проверяет, что периоды правила состоят из целых дней.
+
+    Raises:
+        ValueError: Если правило дробит сутки (например, 'h' или '36h').
+    """
+    offset = pd.tseries.frequencies.to_offset(rule)
+    if isinstance(offset, pd.offsets.Tick) and pd.Timedelta(offset) % _DAY:
+        raise ValueError(f"Правило {rule} мельче суток: агрегатор хранит состояние по дням.")
+
+
+class RevenueAggregator:
+    """
+    Инкрементальный расчет выручки по периодам без повторного просмотра старых поездок.
+
+    Агрегатор принимает новые поездки партиями (например, за один день) и хранит
+    только частичное состояние: дневные суммы длительности и стартовой цены,
+    максимумы тарифов и множества уникальных пользователей за каждый день и за
+    каждый период из `rules`. Результат `total_price` совпадает с
+    `get_total_price_by_rule` на всей истории, а стоимость `update` пропорциональна
+    размеру новой партии.
+
+    Поддерживаются календарные правила ресемплинга ('D', 'W', 'ME', 'MS', 'QE', 'YE'
+    и т.п.), у которых границы периодов не зависят от первой даты в данных.
+    Правила мельче суток ('h', '30min', '36h') отклоняются.
+
+    Args:
+        rules (Iterable[str], optional): Правила, для которых множества пользователей
+            поддерживаются по периодам напрямую. Для остальных правил они собираются
+            из дневных множеств. По умолчанию ('ME',).
+
+    Raises:
+        ValueError: Если среди `rules` есть правило мельче суток.
+
+    Example:
+        >>> aggregator = RevenueAggregator(rules=("ME", "W"))
+        >>> for day_df in daily_batches:
+        ...     aggregator.update(day_df)
+        >>> monthly_revenue = aggregator.total_price("ME")
+    """
+
+    def __init__(self, rules: Iterable[str] = ("ME",)):
+        self.rules = tuple(dict.fromkeys(("D", *rules)))
+        for rule in self.rules:
+            _check_daily_rule(rule)
+        self._daily = pd.DataFrame(
+            columns=list(ADDITIVE_AGGREGATIONS), index=pd.DatetimeIndex([], name="date"), dtype=float
+        )
+        self._users: dict[str, dict[pd.Timestamp, np.ndarray]] = {rule: {} for rule in self.rules}
+
+    def update(self, df: pd.DataFrame) -> "RevenueAggregator":
+        """
+        Добавляет в состояние новую партию поездок.
+
+        Args:
+            df (pd.DataFrame): Новые поездки с колонками 'date' (datetime),
+                'minute_price', 'duration', 'start_ride_price', 'user_id',
+                'subscription_fee'.
+
+        Returns:
+            RevenueAggregator: Этот же агрегатор (для цепочек вызовов).
+        """
+        if df.empty:
+            return self
+
+        days = df["date"].dt.normalize()
+        daily = df.groupby(days)[list(ADDITIVE_AGGREGATIONS)].agg(ADDITIVE_AGGREGATIONS)
+        self._daily = (
+            pd.concat([self._daily, daily.astype(float)])
+            .groupby(level=0)
+            .agg(ADDITIVE_AGGREGATIONS)
+        )
+        self._daily.index.name = "date"
+
+        for rule, periods in self._users.items():
+            grouped = df.groupby(pd.Grouper(key="date", freq=rule))["user_id"].unique()
+            for label, users in grouped.items():
+                if len(users) == 0:
+                    continue
+                users = np.asarray(users, dtype=np.int64)
+                known = periods.get(label)
+                periods[label] = np.unique(users) if known is None else np.union1d(known, users)
+
+        return self
+
+    def total_price(self, rule: str = "ME") -> pd.Series:
+        """
+        Возвращает выручку за каждый период по накопленному состоянию.
+
+        Args:
+            rule (str, optional): Правило ресемплинга Pandas. По умолчанию 'ME'.
+
+        Returns:
+            pd.Series: Серия 'total_price', индексированная датой периода, такая же,
+            как у `get_total_price_by_rule` на всех добавленных поездках. До первого
+            `update` серия пустая.
+
+        Raises:
+            ValueError: Если правило мельче суток.
+        """
+        _check_daily_rule(rule)
+        aggregated = self._daily.resample(rule).agg(ADDITIVE_AGGREGATIONS)
+        aggregated["user_id"] = self.unique_users(rule).reindex(aggregated.index, fill_value=0)
+        return total_price_from_aggregates(aggregated)
+
+    def unique_users(self, rule: str = "ME") -> pd.Series:
+        """
+        Возвращает точное число уникальных пользователей за каждый период.
+
+        Args:
+            rule (str, optional): Правило ресемплинга Pandas. По умолчанию 'ME'.
+
+        Returns:
+            pd.Series: Число уникальных `user_id` по непустым периодам.
+
+        Raises:
+            ValueError: Если правило мельче суток.
+        """
+        _check_daily_rule(rule)
+        if rule in self._users:
+            periods = self._users[rule]
+            return pd.Series(
+                [len(users) for users in periods.values()],
+                index=pd.DatetimeIndex(list(periods), name="date"),
+                dtype=np.int64,
+            ).sort_index()
+
+        daily_users = self._users["D"]
+        pairs = pd.DataFrame(
+            {
+                "date": np.repeat(
+                    pd.DatetimeIndex(list(daily_users)),
+                    [len(users) for users in daily_users.values()],
+                ),
+                "user_id": np.concatenate(list(daily_users.values()) or [np.empty(0, np.int64)]),
+            }
+        )
+        return pairs.resample(rule, on="date")["user_id"].nunique()
+
+    def save(self, path: Path) -> None:
+        """Сохраняет состояние агрегатора в файл (pickle)."""
+        with open(path, "wb") as file:
+            pickle.dump(self, file)
+
+    @classmethod
+    def load(cls, path: Path) -> "RevenueAggregator":
+        """Загружает состояние агрегатора, сохраненное методом `save`."""
+        with open(path, "rb") as file:
+            return pickle.load(file)
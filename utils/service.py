@@ -0,0 +1,392 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from .EDA import RevenueCube, build_revenue_cube, get_percent_with_sub, get_total_price_from_cube
+from .model import RidesModel
+from .user_index import _sources_fingerprint
+
+_CUBE_COLUMNS = (
+    "date", "minute_price", "duration", "start_ride_price", "user_id", "subscription_fee",
+    "subscription_type", "city",
+)
+
+# Типовые запросы аналитиков: ответы на них считаются сразу после загрузки агрегатов
+WARM_QUERIES = (
+    ("/revenue", {"subscription_type": ["ultra"]}),
+    ("/revenue", {"subscription_type": ["free"]}),
+    ("/revenue_share", {}),
+    ("/duration", {"by": ["city"]}),
+    ("/subscribers", {}),
+)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ServiceAggregates:
+    """
+    Предрасчитанные агрегаты, из которых сервис отвечает на запросы.
+
+    Attributes:
+        cube (RevenueCube): Куб выручки день × тип подписки × город.
+        durations (pd.DataFrame): Статистики длительности поездок по паре
+            (город, тип подписки): 'rides', 'sum', 'sum_sq', 'min', 'max'.
+        users (pd.DataFrame): Справочник пользователей модели.
+        source (dict): Отпечатки исходных файлов на момент построения.
+        loaded_at (float): Время построения (Unix time).
+    """
+
+    cube: RevenueCube
+    durations: pd.DataFrame
+    users: pd.DataFrame
+    source: dict
+    loaded_at: float
+
+    @classmethod
+    def build(cls) -> "ServiceAggregates":
+        """Строит агрегаты по очищенным данным проекта."""
+        source = _sources_fingerprint()
+        model = RidesModel.load()
+        df = model.frame(list(_CUBE_COLUMNS)).astype({"duration": float})
+
+        # Суммы и суммы квадратов складываются при объединении сегментов в запросе
+        durations = df.assign(duration_sq=df["duration"] ** 2).groupby(
+            ["city", "subscription_type"], observed=True
+        ).agg(
+            rides=("duration", "size"),
+            sum=("duration", "sum"),
+            sum_sq=("duration_sq", "sum"),
+            min=("duration", "min"),
+            max=("duration", "max"),
+        )
+        return cls(
+            cube=build_revenue_cube(df),
+            durations=durations,
+            users=model.users,
+            source=source,
+            loaded_at=time.time(),
+        )
+
+
+class LRUCache:
+    """
+    Кэш результатов запросов с вытеснением давно не использованных записей.
+
+    Example:
+        >>> cache = LRUCache(maxsize=2)
+        >>> cache.put("a", b"1")
+        >>> cache.get("a")
+        b'1'
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        """Возвращает значение и помечает его как недавно использованное или None."""
+        if key not in self._data:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value) -> None:
+        """Сохраняет значение, вытесняя самую старую запись при переполнении."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _as_filter(values: list[str]):
+    """Значение фильтра из параметров запроса: строка или список при повторе параметра."""
+    return values[0] if len(values) == 1 else values
+
+
+def _pop_single(params: dict[str, list[str]], name: str, default: str) -> str:
+    """Извлекает одиночный параметр запроса."""
+    values = params.pop(name, [default])
+    if len(values) != 1:
+        raise ValueError(f"Параметр {name} должен быть указан один раз.")
+    return values[0]
+
+
+def _cache_key(path: str, params: dict[str, list[str]]) -> tuple:
+    """Ключ кэша ответа: путь и параметры запроса без учета их порядка."""
+    return path, tuple(sorted((name, tuple(values)) for name, values in params.items()))
+
+
+class QueryService:
+    """
+    Локальный asyncio-сервис запросов к предрасчитанным агрегатам поездок и выручки.
+
+    Агрегаты строятся при запуске и хранятся в памяти. Ответы на запросы
+    сериализуются в JSON один раз и сохраняются в LRU-кэше, поэтому повторный
+    запрос обслуживается без обращения к pandas. Фоновая задача следит за
+    исходными файлами и при их изменении пересобирает агрегаты и очищает кэш;
+    если пересборка не удалась, ошибка пишется в журнал и повторяется позже.
+
+    Запросы (HTTP GET, параметры в строке запроса; повтор параметра задает список):
+        /revenue?rule=ME&subscription_type=ultra&city=Омск — выручка по периодам.
+        /revenue_share?rule=ME&with_sub=ultra — выручка и доли с подпиской и без.
+        /duration?by=city&city=Омск&subscription_type=free — статистики длительности.
+        /subscribers?by=city&with_sub=ultra — доля пользователей с подпиской.
+        /health — время загрузки агрегатов и статистика кэша.
+
+    Example:
+        >>> service = QueryService()
+        >>> service.query("/revenue", {"subscription_type": ["ultra"]})
+        >>> asyncio.run(service.serve(port=8050))
+    """
+
+    def __init__(self, cache_size: int = 256, reload_interval: float = 1.0):
+        """
+        Args:
+            cache_size (int, optional): Максимальное количество ответов в кэше. По умолчанию 256.
+            reload_interval (float, optional): Период проверки исходных файлов, в секундах.
+                По умолчанию 1.0.
+        """
+        self.cache = LRUCache(cache_size)
+        self.reload_interval = reload_interval
+        self._handlers: dict[str, Callable[[ServiceAggregates, dict], str]] = {
+            "/revenue": self._revenue,
+            "/revenue_share": self._revenue_share,
+            "/duration": self._duration,
+            "/subscribers": self._subscribers,
+        }
+        self._swap(*self._build())
+
+    def _revenue(self, aggregates: ServiceAggregates, params: dict[str, list[str]]) -> str:
+        rule = _pop_single(params, "rule", "ME")
+        segment = {name: _as_filter(values) for name, values in params.items()}
+        return get_total_price_from_cube(aggregates.cube, rule, **segment).to_json(
+            orient="split", date_format="iso", force_ascii=False
+        )
+
+    def _revenue_share(self, aggregates: ServiceAggregates, params: dict[str, list[str]]) -> str:
+        rule = _pop_single(params, "rule", "ME")
+        with_sub = _pop_single(params, "with_sub", "ultra")
+        if params:
+            raise ValueError(f"Неизвестные параметры: {sorted(params)}")
+        return get_percent_with_sub(aggregates.cube, rule, with_sub).to_json(
+            orient="split", date_format="iso", force_ascii=False
+        )
+
+    def _duration(self, aggregates: ServiceAggregates, params: dict[str, list[str]]) -> str:
+        by = params.pop("by", [])
+        durations = aggregates.durations.reset_index()
+        for name, values in params.items():
+            if name not in ("city", "subscription_type"):
+                raise ValueError(f"Неизвестный параметр: {name}")
+            durations = durations[durations[name].isin(values)]
+        if by:
+            grouped = durations.groupby(by, observed=True)
+        else:
+            grouped = durations.groupby(lambda _: "all")
+        stats = grouped.agg(
+            rides=("rides", "sum"), sum=("sum", "sum"), sum_sq=("sum_sq", "sum"),
+            min=("min", "min"), max=("max", "max"),
+        )
+        stats["mean"] = stats["sum"] / stats["rides"]
+        stats["std"] = ((stats["sum_sq"] - stats["rides"] * stats["mean"] ** 2) / (stats["rides"] - 1)) ** 0.5
+        return stats[["rides", "mean", "std", "min", "max"]].to_json(orient="split", force_ascii=False)
+
+    def _subscribers(self, aggregates: ServiceAggregates, params: dict[str, list[str]]) -> str:
+        by = params.pop("by", [])
+        with_sub = _pop_single(params, "with_sub", "ultra")
+        if params:
+            raise ValueError(f"Неизвестные параметры: {sorted(params)}")
+        users = aggregates.users.assign(subscribers=aggregates.users["subscription_type"] == with_sub)
+        grouped = users.groupby(by, observed=True) if by else users.groupby(lambda _: "all")
+        share = grouped["subscribers"].agg(users="size", subscribers="sum", share="mean")
+        return share.to_json(orient="split", force_ascii=False)
+
+    def query(self, path: str, params: dict[str, list[str]]) -> bytes:
+        """
+        Отвечает на запрос из кэша или считает ответ по агрегатам.
+
+        Args:
+            path (str): Путь запроса, например '/revenue'.
+            params (dict[str, list[str]]): Параметры запроса в формате `parse_qs`.
+
+        Returns:
+            bytes: Ответ в JSON.
+
+        Raises:
+            KeyError: Если путь неизвестен.
+            ValueError: Если параметры запроса некорректны.
+        """
+        if path == "/health":
+            return json.dumps(
+                {
+                    "loaded_at": self.aggregates.loaded_at,
+                    "cache": {"size": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+                }
+            ).encode()
+        if path not in self._handlers:
+            raise KeyError(f"Неизвестный запрос: {path}")
+
+        key = _cache_key(path, params)
+        body = self.cache.get(key)
+        if body is None:
+            body = self._answer(self.aggregates, path, params)
+            self.cache.put(key, body)
+        return body
+
+    def _answer(self, aggregates: ServiceAggregates, path: str, params: dict[str, list[str]]) -> bytes:
+        """Считает ответ на запрос по переданным агрегатам."""
+        return self._handlers[path](aggregates, {name: list(values) for name, values in params.items()}).encode()
+
+    def _is_stale(self) -> bool:
+        """Проверяет, изменились ли исходные файлы после построения агрегатов."""
+        return _sources_fingerprint() != self.aggregates.source
+
+    def _build(self) -> tuple[ServiceAggregates, dict]:
+        """Строит агрегаты и ответы на `WARM_QUERIES` по ним, не трогая текущее состояние."""
+        aggregates = ServiceAggregates.build()
+        warm = {
+            _cache_key(path, params): self._answer(aggregates, path, params) for path, params in WARM_QUERIES
+        }
+        return aggregates, warm
+
+    def _swap(self, aggregates: ServiceAggregates, warm: dict) -> None:
+        """Подменяет агрегаты целиком и заполняет кэш готовыми ответами."""
+        self.aggregates = aggregates
+        self.cache.clear()
+        for key, body in warm.items():
+            self.cache.put(key, body)
+
+    def reload(self) -> bool:
+        """
+        Пересобирает агрегаты, если исходные файлы изменились.
+
+        Returns:
+            bool: True, если агрегаты были пересобраны.
+        """
+        if not self._is_stale():
+            return False
+        self._swap(*self._build())
+        return True
+
+    async def _watch(self) -> None:
+        """Периодически проверяет исходные файлы и перезагружает агрегаты."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if self._is_stale():
+                    # Построение агрегатов и типовых ответов — в отдельном потоке, подмена —
+                    # в цикле событий, между запросами, чтобы в кэш не попал ответ по старым агрегатам
+                    self._swap(*await loop.run_in_executor(None, self._build))
+            except Exception:
+                # Например, CSV-файл еще дописывается: сервис продолжает работать на старых
+                # агрегатах, а пересборка повторяется при следующей проверке
+                logger.exception("Не удалось перезагрузить агрегаты, повтор через %s с", self.reload_interval)
+
+    def _respond(self, target: str) -> tuple[int, bytes]:
+        """Формирует статус и тело ответа на GET-запрос."""
+        url = urlsplit(target)
+        try:
+            return 200, self.query(url.path, parse_qs(url.query))
+        except KeyError as error:
+            status = 404 if url.path not in self._handlers else 400
+            return status, json.dumps({"error": str(error.args[0])}, ensure_ascii=False).encode()
+        except ValueError as error:
+            return 400, json.dumps({"error": str(error)}, ensure_ascii=False).encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обслуживает HTTP/1.1-соединение, в том числе с keep-alive."""
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+
+                method, target, *_ = request_line.decode("latin-1").split()
+                if method == "GET":
+                    status, body = self._respond(target)
+                else:
+                    status, body = 405, b'{"error": "GET only"}'
+
+                keep_alive = headers.get("connection") != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+            self, host: str = "127.0.0.1", port: int = 8050, unix_path: Optional[str] = None
+    ) -> None:
+        """
+        Запускает сервис и работает до отмены задачи.
+
+        Args:
+            host (str, optional): Адрес для TCP. По умолчанию '127.0.0.1'.
+            port (int, optional): Порт для TCP. По умолчанию 8050.
+            unix_path (Optional[str], optional): Путь к Unix-сокету; если задан,
+                используется вместо TCP. По умолчанию None.
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        watcher = asyncio.create_task(self._watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def main() -> None:
+    """Точка входа: `python -m utils.service --port 8050`."""
+    parser = argparse.ArgumentParser(description="Локальный сервис запросов к агрегатам GoFast.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--cache-size", type=int, default=256)
+    parser.add_argument("--reload-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    service = QueryService(args.cache_size, args.reload_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import MIN_DISTANCE, MIN_DURATION, clean_users
+from .paths import joinpath
+
+
+def _bandwidth(values: np.ndarray) -> float:
+    """Ширина ядра по правилу Сильвермана для сглаженного бутстрепа."""
+    if values.size < 2:
+        return 0.0
+    q75, q25 = np.percentile(values, [75, 25])
+    spread = min(values.std(), (q75 - q25) / 1.34) or values.std()
+    return 0.9 * spread * values.size ** (-1 / 5)
+
+
+def fit_rides_model(source_dir: Optional[Path] = None) -> dict:
+    """
+    Подбирает параметры генератора по исходным данным GoFast.
+
+    Сохраняет эмпирические распределения, на основе которых `generate_dataset`
+    строит синтетические данные: профили пользователей, количество поездок
+    на пользователя и пары (расстояние, длительность) по типу подписки, даты
+    поездок, а также доли дубликатов пользователей и аномальных поездок.
+
+    Args:
+        source_dir (Optional[Path], optional): Каталог с `users_go.csv`, `rides_go.csv`
+            и `subscriptions_go.csv`. По умолчанию каталог `data` проекта.
+
+    Returns:
+        dict: Параметры модели данных.
+    """
+    source_dir = Path(source_dir or joinpath("data"))
+    users_df = pd.read_csv(source_dir / "users_go.csv", encoding="utf-8")
+    rides_df = pd.read_csv(source_dir / "rides_go.csv", encoding="utf-8")
+    subscriptions_df = pd.read_csv(source_dir / "subscriptions_go.csv", encoding="utf-8")
+
+    cleaned_users_df = clean_users(users_df)
+    rides_df = rides_df.merge(cleaned_users_df[["user_id", "subscription_type"]], on="user_id")
+    anomalous = (rides_df["duration"] <= MIN_DURATION) | (rides_df["distance"] <= MIN_DISTANCE)
+
+    rides_by_type = {}
+    for subscription_type, group in rides_df.groupby("subscription_type"):
+        normal = group.loc[~anomalous.loc[group.index]]
+        rides_by_type[subscription_type] = {
+            "distance": group["distance"].to_numpy(),
+            "duration": group["duration"].to_numpy(),
+            "anomalous": anomalous.loc[group.index].to_numpy(),
+            "bandwidth": (
+                _bandwidth(normal["distance"].to_numpy()),
+                _bandwidth(normal["duration"].to_numpy()),
+            ),
+            "bounds": (
+                (normal["distance"].min(), normal["distance"].max()),
+                (normal["duration"].min(), normal["duration"].max()),
+            ),
+            "rides_per_user": group.groupby("user_id").size().to_numpy(),
+        }
+
+    return {
+        "users": cleaned_users_df.drop(columns="user_id").reset_index(drop=True),
+        "subscriptions": subscriptions_df,
+        "rides": rides_by_type,
+        "dates": rides_df["date"].to_numpy(),
+        "duplicate_rate": len(users_df) / len(cleaned_users_df) - 1,
+        "rides_per_user": len(rides_df) / len(cleaned_users_df),
+    }
+
+
+def _sample_rides(
+        model: dict, subscription_type: str, size: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Генерирует пары (расстояние, длительность) сглаженным бутстрепом по типу подписки."""
+    source = model["rides"][subscription_type]
+    picks = rng.integers(0, source["distance"].size, size)
+    distance = source["distance"][picks].copy()
+    duration = source["duration"][picks].copy()
+
+    # Аномальные поездки воспроизводятся как есть, остальные сглаживаются ядром
+    smooth = ~source["anomalous"][picks]
+    (distance_bw, duration_bw), (distance_bounds, duration_bounds) = source["bandwidth"], source["bounds"]
+    distance[smooth] = np.clip(
+        distance[smooth] + rng.normal(0, distance_bw, smooth.sum()), *distance_bounds
+    )
+    duration[smooth] = np.clip(
+        duration[smooth] + rng.normal(0, duration_bw, smooth.sum()), *duration_bounds
+    )
+    return distance, duration
+
+
+def generate_dataset(
+        n_rides: int,
+        output_dir: Path,
+        seed: Optional[int] = None,
+        model: Optional[dict] = None,
+        chunksize: int = 1_000_000,
+) -> dict[str, int]:
+    """
+    Генерирует синтетические `users_go.csv`, `rides_go.csv` и `subscriptions_go.csv`.
+
+    Файлы совпадают по схеме с исходными данными. Профили пользователей,
+    количество поездок на пользователя, пары (расстояние, длительность) по типу
+    подписки и даты берутся из эмпирических распределений исходных данных
+    (сглаженный бутстреп), доли дубликатов пользователей и аномально коротких
+    поездок сохраняются. Поездки упорядочены по `user_id` и дате, как в
+    исходном файле, и записываются частями, поэтому память не зависит от `n_rides`.
+
+    Args:
+        n_rides (int): Количество поездок.
+        output_dir (Path): Каталог для сохранения файлов. Создается при необходимости.
+        seed (Optional[int], optional): Зерно генератора. По умолчанию None.
+        model (Optional[dict], optional): Параметры из `fit_rides_model`. Если None,
+            подбираются по данным проекта. По умолчанию None.
+        chunksize (int, optional): Примерное количество поездок в одной записываемой
+            части. По умолчанию 1 000 000.
+
+    Returns:
+        dict[str, int]: Количество пользователей ('users', с дубликатами) и поездок ('rides').
+
+    Example:
+        >>> generate_dataset(10_000_000, Path("/tmp/gofast_10m"), seed=42)
+    """
+    model = model or fit_rides_model()
+    rng = np.random.default_rng(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    n_users = max(1, int(round(n_rides / model["rides_per_user"])))
+    users_df = model["users"].iloc[rng.integers(0, len(model["users"]), n_users)].reset_index(drop=True)
+    users_df.insert(0, "user_id", np.arange(1, n_users + 1))
+
+    # Количество поездок на пользователя — из эмпирического распределения его типа подписки,
+    # затем подгонка суммы ровно к n_rides
+    counts = np.zeros(n_users, dtype=np.int64)
+    subscription_types = users_df["subscription_type"].to_numpy()
+    for subscription_type, source in model["rides"].items():
+        mask = subscription_types == subscription_type
+        counts[mask] = rng.choice(source["rides_per_user"], mask.sum())
+    diff = n_rides - counts.sum()
+    if diff > 0:
+        counts += rng.multinomial(diff, np.full(n_users, 1 / n_users))
+    elif diff < 0:
+        counts -= rng.multivariate_hypergeometric(counts, -diff, method="marginals")
+
+    n_duplicates = int(round(n_users * model["duplicate_rate"]))
+    duplicates = users_df.iloc[rng.integers(0, n_users, n_duplicates)]
+    pd.concat([users_df, duplicates]).to_csv(output_dir / "users_go.csv", index=False)
+    model["subscriptions"].to_csv(output_dir / "subscriptions_go.csv", index=False)
+
+    boundaries = np.searchsorted(np.cumsum(counts), np.arange(chunksize, n_rides, chunksize))
+    starts = np.concatenate([[0], boundaries + 1])
+    stops = np.concatenate([boundaries + 1, [n_users]])
+
+    for idx, (start, stop) in enumerate(zip(starts, stops)):
+        owners = np.repeat(np.arange(start, stop), counts[start:stop])
+        distance = np.empty(owners.size)
+        duration = np.empty(owners.size)
+        owner_types = subscription_types[owners]
+        for subscription_type in model["rides"]:
+            mask = owner_types == subscription_type
+            distance[mask], duration[mask] = _sample_rides(model, subscription_type, mask.sum(), rng)
+
+        dates = model["dates"][rng.integers(0, model["dates"].size, owners.size)]
+        order = np.lexsort((dates, owners))
+        pd.DataFrame(
+            {
+                "user_id": owners[order] + 1,
+                "distance": distance[order],
+                "duration": duration[order],
+                "date": dates[order],
+            }
+        ).to_csv(output_dir / "rides_go.csv", index=False, mode="w" if idx == 0 else "a", header=idx == 0)
+
+    return {"users": n_users + n_duplicates, "rides": int(counts.sum())}
@@ -0,0 +1,311 @@
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .loader import CACHE_DIR, _source_fingerprint
+from .model import RidesModel
+from .paths import joinpath
+from .profiling import profiled
+
+INDEX_PATH = CACHE_DIR / "user_index.npz"
+
+# Файлы, из которых строится индекс: при их изменении сохраненный индекс пересобирается
+INDEX_SOURCES = ("cleaned_rides_go.csv", "cleaned_users_go.csv", "subscriptions_go.csv")
+
+_RIDE_COLUMNS = ("distance", "duration", "date")
+_USER_CATEGORIES = ("city", "subscription_type")
+
+
+def _sources_fingerprint() -> dict:
+    """Собирает отпечатки исходных файлов индекса."""
+    return {name: _source_fingerprint(joinpath("data", name), "mtime") for name in INDEX_SOURCES}
+
+
+@dataclass(frozen=True)
+class UserRideIndex:
+    """
+    Индекс поездок по пользователям в формате CSR.
+
+    Поездки отсортированы по пользователю и дате, поездки пользователя на позиции `i`
+    занимают отрезок `offsets[i]:offsets[i + 1]`. Плотный массив `lookup` переводит
+    `user_id` в позицию за O(1), а таблица `users` хранит атрибуты пользователя и
+    заранее посчитанные агрегаты, поэтому вопросы по пользователям и когортам
+    не требуют `groupby` по всей таблице поездок.
+
+    Attributes:
+        users (pd.DataFrame): По строке на пользователя, отсортировано по 'user_id':
+            'user_id', 'city', 'subscription_type', 'age', 'rides', 'distance',
+            'duration', 'active_months', 'revenue', 'first_ride', 'last_ride'.
+        offsets (np.ndarray): Границы отрезков поездок пользователей (int64, длина n + 1).
+        lookup (np.ndarray): Позиция пользователя по `user_id` или -1 (int32).
+        rides (pd.DataFrame): Поездки в порядке индекса: 'distance', 'duration', 'date'.
+
+    Example:
+        >>> index = UserRideIndex.load()
+        >>> index.user_rides(42)
+        >>> index.cohort(subscription_type="ultra", age=(18, 25))["revenue"].mean()
+    """
+
+    users: pd.DataFrame
+    offsets: np.ndarray
+    lookup: np.ndarray
+    rides: pd.DataFrame
+
+    @classmethod
+    @profiled
+    def build(cls, model: RidesModel) -> "UserRideIndex":
+        """
+        Строит индекс по нормализованной модели данных.
+
+        Выручка пользователя считается так же, как в `get_total_price_by_rule` с
+        правилом 'ME': поминутная оплата и старт каждой поездки плюс абонентская
+        плата за каждый месяц, в котором была хотя бы одна поездка.
+
+        Args:
+            model (RidesModel): Нормализованная модель поездок.
+
+        Returns:
+            UserRideIndex: Индекс поездок и агрегаты по пользователям.
+        """
+        positions = model.user_positions
+        dates = model.rides["date"].to_numpy()
+        order = np.lexsort((dates, positions))
+        positions = positions[order]
+        dates = dates[order]
+
+        n_users = len(model.users)
+        counts = np.bincount(positions, minlength=n_users)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        distance = model.rides["distance"].to_numpy()[order]
+        duration = model.rides["duration"].to_numpy()[order]
+
+        # Поездки внутри пользователя упорядочены по дате, поэтому новый месяц —
+        # это смена пользователя или месяца относительно предыдущей поездки
+        months = dates.astype("datetime64[M]")
+        new_month = np.ones(positions.size, dtype=bool)
+        new_month[1:] = (positions[1:] != positions[:-1]) | (months[1:] != months[:-1])
+        active_months = np.bincount(positions[new_month], minlength=n_users)
+
+        tariffs = model.subscriptions.iloc[model.users["subscription_pos"].to_numpy()]
+        duration_sum = np.bincount(positions, weights=duration.astype(np.float64), minlength=n_users)
+        revenue = (
+            duration_sum * tariffs["minute_price"].to_numpy()
+            + counts * tariffs["start_ride_price"].to_numpy()
+            + active_months * tariffs["subscription_fee"].to_numpy()
+        )
+
+        first = np.full(n_users, np.datetime64("NaT"), dtype=dates.dtype)
+        last = first.copy()
+        has_rides = counts > 0
+        first[has_rides] = dates[offsets[:-1][has_rides]]
+        last[has_rides] = dates[offsets[1:][has_rides] - 1]
+
+        user_ids = model.users["user_id"].to_numpy()
+        lookup = np.full(int(user_ids.max(initial=-1)) + 1, -1, dtype=np.int32)
+        lookup[user_ids] = np.arange(n_users, dtype=np.int32)
+
+        users = pd.DataFrame(
+            {
+                "user_id": user_ids,
+                "city": model.users["city"],
+                "subscription_type": model.users["subscription_type"],
+                "age": model.users["age"].to_numpy(),
+                "rides": counts,
+                "distance": np.bincount(positions, weights=distance, minlength=n_users),
+                "duration": duration_sum,
+                "active_months": active_months,
+                "revenue": revenue,
+                "first_ride": first,
+                "last_ride": last,
+            }
+        )
+        rides = pd.DataFrame({"distance": distance, "duration": duration, "date": dates})
+        return cls(users=users, offsets=offsets, lookup=lookup, rides=rides)
+
+    def save(self, path: Optional[Path] = None, source: Optional[dict] = None) -> None:
+        """
+        Сохраняет индекс в несжатый .npz-файл.
+
+        Args:
+            path (Optional[Path], optional): Путь к файлу. По умолчанию `INDEX_PATH`.
+            source (Optional[dict], optional): Отпечатки исходных файлов для проверки
+                актуальности при загрузке. По умолчанию None.
+        """
+        path = Path(path or INDEX_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = {"offsets": self.offsets, "lookup": self.lookup}
+        for col in self.users.columns:
+            values = self.users[col]
+            if col in _USER_CATEGORIES:
+                arrays[f"users.{col}.codes"] = values.cat.codes.to_numpy()
+                arrays[f"users.{col}.categories"] = values.cat.categories.to_numpy(dtype=str)
+            else:
+                arrays[f"users.{col}"] = values.to_numpy()
+        for col in _RIDE_COLUMNS:
+            arrays[f"rides.{col}"] = self.rides[col].to_numpy()
+        arrays["source"] = np.array(json.dumps(source or {}))
+
+        # Запись во временный файл и замена, чтобы прерванная запись не портила индекс
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, path: Optional[Path] = None) -> tuple["UserRideIndex", dict]:
+        """
+        Читает индекс, сохраненный `save`.
+
+        Args:
+            path (Optional[Path], optional): Путь к файлу. По умолчанию `INDEX_PATH`.
+
+        Returns:
+            tuple[UserRideIndex, dict]: Индекс и отпечатки исходных файлов.
+        """
+        with np.load(Path(path or INDEX_PATH), allow_pickle=False) as arrays:
+            users = {}
+            for key in arrays.files:
+                if not key.startswith("users.") or key.endswith(".categories"):
+                    continue
+                col = key.split(".")[1]
+                if col in _USER_CATEGORIES:
+                    users[col] = pd.Categorical.from_codes(
+                        arrays[key], categories=arrays[f"users.{col}.categories"].astype(object)
+                    )
+                else:
+                    users[col] = arrays[key]
+            index = cls(
+                users=pd.DataFrame(users),
+                offsets=arrays["offsets"],
+                lookup=arrays["lookup"],
+                rides=pd.DataFrame({col: arrays[f"rides.{col}"] for col in _RIDE_COLUMNS}),
+            )
+            source = json.loads(arrays["source"].item())
+        return index, source
+
+    @classmethod
+    def load(cls, rebuild: bool = False) -> "UserRideIndex":
+        """
+        Загружает индекс очищенных данных проекта из `INDEX_PATH`.
+
+        Индекс строится при первом вызове и пересобирается, если изменился
+        любой из файлов `INDEX_SOURCES`.
+
+        Args:
+            rebuild (bool, optional): Если True, индекс строится заново. По умолчанию False.
+
+        Returns:
+            UserRideIndex: Индекс поездок по пользователям.
+        """
+        source = _sources_fingerprint()
+        if not rebuild and INDEX_PATH.exists():
+            index, saved_source = cls.read()
+            if saved_source == source:
+                return index
+
+        index = cls.build(RidesModel.load())
+        index.save(source=source)
+        return index
+
+    def position(self, user_id: int) -> int:
+        """
+        Возвращает позицию пользователя в индексе за O(1).
+
+        Raises:
+            KeyError: Если пользователя нет в индексе.
+        """
+        pos = self.lookup[user_id] if 0 <= user_id < self.lookup.size else -1
+        if pos < 0:
+            raise KeyError(f"Пользователь отсутствует в индексе: {user_id}")
+        return int(pos)
+
+    def user_rides(self, user_id: int) -> pd.DataFrame:
+        """Возвращает поездки пользователя в порядке дат (срез без копирования данных)."""
+        pos = self.position(user_id)
+        return self.rides.iloc[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def user_stats(self, user_id: int) -> pd.Series:
+        """Возвращает атрибуты и агрегаты пользователя."""
+        return self.users.iloc[self.position(user_id)]
+
+    def cohort_mask(
+            self, age: Optional[tuple[int, int]] = None, **filters: Union[str, list]
+    ) -> np.ndarray:
+        """
+        Строит маску пользователей когорты.
+
+        Args:
+            age (Optional[tuple[int, int]], optional): Возрастная группа [от, до).
+                По умолчанию None.
+            **filters: Значение или список значений для 'city' и 'subscription_type'.
+
+        Returns:
+            np.ndarray: Булева маска по строкам `users`.
+
+        Raises:
+            KeyError: Если фильтр задан для неизвестной колонки.
+        """
+        mask = np.ones(len(self.users), dtype=bool)
+        for name, values in filters.items():
+            if name not in _USER_CATEGORIES:
+                raise KeyError(f"Неизвестный атрибут когорты: {name}")
+            values = values if isinstance(values, list) else [values]
+            mask &= self.users[name].isin(values).to_numpy()
+        if age is not None:
+            ages = self.users["age"].to_numpy()
+            mask &= (ages >= age[0]) & (ages < age[1])
+        return mask
+
+    def cohort(self, age: Optional[tuple[int, int]] = None, **filters: Union[str, list]) -> pd.DataFrame:
+        """
+        Возвращает агрегаты пользователей когорты.
+
+        Example:
+            >>> index.cohort(subscription_type="ultra")["user_id"].nunique()
+            >>> index.cohort(city=["Омск", "Тюмень"], age=(18, 25))["revenue"].sum()
+        """
+        return self.users.loc[self.cohort_mask(age, **filters)]
+
+    def cohort_rides(self, age: Optional[tuple[int, int]] = None, **filters: Union[str, list]) -> pd.DataFrame:
+        """Возвращает поездки пользователей когорты, собранные по отрезкам индекса."""
+        positions = np.flatnonzero(self.cohort_mask(age, **filters))
+        starts, stops = self.offsets[positions], self.offsets[positions + 1]
+        lengths = stops - starts
+        # Индексы всех поездок отрезков без цикла по пользователям
+        rides = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.rides.iloc[rides]
+
+    def cohort_summary(self, by: Union[str, list[str]], age_bins: Optional[list[int]] = None) -> pd.DataFrame:
+        """
+        Сводка по когортам на уровне пользователей.
+
+        Args:
+            by (Union[str, list[str]]): Колонки группировки, например 'subscription_type'
+                или ['city', 'age_band'].
+            age_bins (Optional[list[int]], optional): Границы возрастных групп для колонки
+                'age_band' (интервалы [от, до)). По умолчанию None.
+
+        Returns:
+            pd.DataFrame: 'users', 'rides', 'duration', 'revenue' и 'revenue_per_user'
+            по каждой когорте.
+
+        Example:
+            >>> index.cohort_summary(["subscription_type", "age_band"], age_bins=[0, 18, 25, 35, 100])
+        """
+        users = self.users
+        if age_bins is not None:
+            users = users.assign(age_band=pd.cut(users["age"], age_bins, right=False))
+        summary = users.groupby(by, observed=True).agg(
+            users=("user_id", "size"),
+            rides=("rides", "sum"),
+            duration=("duration", "sum"),
+            revenue=("revenue", "sum"),
+        )
+        summary["revenue_per_user"] = summary["revenue"] / summary["users"]
+        return summary
@@ -1,11 +1,26 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 import numpy as np
 import pandas as pd
 import seaborn as sns
+import matplotlib
+import matplotlib.dates as mdates
+import matplotlib.patches
 import matplotlib.pyplot as plt
 
+from .loader import _source_fingerprint
+from .overview import _iter_chunks
+from .profiling import profiled
+
 # Глобальные настройки стиля для matplotlib
 plt.rcParams.update(
     {
@@ -23,13 +38,26 @@ sns.set_style("whitegrid")
 sns.set_context("paper")
 
 
+def _save_figure(fig: plt.Figure, save_path: Optional[Union[Path, list[Path]]]) -> None:
+    """Сохраняет фигуру по одному или нескольким путям."""
+    if not save_path:
+        return
+    for path in [save_path] if isinstance(save_path, (str, Path)) else save_path:
+        fig.savefig(path)
+
+
+@profiled
 def hist_boxplot(
         data: pd.DataFrame,
         columns: list[str],
         ncols: int = 2,
         hue: Optional[str] = None,
         kde: bool = False,
-        save_path: Optional[Path] = None,
+        save_path: Optional[Union[Path, list[Path]]] = None,
+        show: bool = True,
+        binned: bool = False,
+        bins: int = 50,
+        summary: Optional[dict] = None,
 ) -> None:
     """
     Создает комбинированные графики: гистограмму и boxplot для указанных числовых колонок.
@@ -46,8 +74,16 @@ def hist_boxplot(
             По умолчанию None.
         kde (bool, optional): Если True, добавляет кривую плотности распределения (KDE) к гистограмме.
             По умолчанию False.
-        save_path (Optional[Path], optional): Путь для сохранения графика. Если None, график только отображается.
-            По умолчанию None.
+        save_path (Optional[Union[Path, list[Path]]], optional): Путь или список путей для сохранения
+            графика (например, PNG и SVG). Если None, график только отображается. По умолчанию None.
+        show (bool, optional): Если False, график не отображается через plt.show() (например,
+            при пакетной выгрузке на неинтерактивном бэкенде). По умолчанию True.
+        binned (bool, optional): Если True, графики строятся по предварительно посчитанной
+            сводке (`summarize_hist_box`), а не по исходным строкам. Время отрисовки
+            перестает зависеть от количества строк. По умолчанию False.
+        bins (int, optional): Количество бинов гистограммы в режиме `binned`. По умолчанию 50.
+        summary (Optional[dict], optional): Готовая сводка из `summarize_hist_box`. Если
+            передана, используется режим `binned`, а `data` может быть None. По умолчанию None.
 
     Returns:
         None: Функция отображает графики через plt.show() и не возвращает значения.
@@ -59,7 +95,13 @@ def hist_boxplot(
         >>> # Анализ с разделением по полу и сохранением в файл
         >>> hist_boxplot(df, columns=['height', 'weight'], hue='gender',
         ...              save_path=Path('distributions.png'))
+        >>>
+        >>> # Быстрый режим для миллионов строк
+        >>> hist_boxplot(rides_df, columns=['duration', 'distance'], hue='city', binned=True)
     """
+    if binned and summary is None:
+        summary = summarize_hist_box(data, columns, hue=hue, bins=bins)
+
     plot_rows = len(columns)
     fig, axes = plt.subplots(
         nrows=plot_rows,
@@ -70,8 +112,11 @@ def hist_boxplot(
     )
 
     for idx, col in enumerate(columns):
-        sns.histplot(data=data, x=col, ax=axes[idx, 0], kde=kde, hue=hue)
-        sns.boxplot(data=data, x=col, ax=axes[idx, 1], hue=hue)
+        if summary is not None:
+            _draw_hist_box_summary(axes[idx, 0], axes[idx, 1], summary[col], kde=kde)
+        else:
+            sns.histplot(data=data, x=col, ax=axes[idx, 0], kde=kde, hue=hue)
+            sns.boxplot(data=data, x=col, ax=axes[idx, 1], hue=hue)
 
         axes[idx, 0].set_xlabel(col)
         axes[idx, 1].set_xlabel(col)
@@ -79,19 +124,25 @@ def hist_boxplot(
 
     plt.suptitle("Гистограмма и ящик с усами количественных признаков")
 
-    if save_path:
-        plt.savefig(save_path)
-    plt.show()
+    _save_figure(fig, save_path)
+    if show:
+        plt.show()
     plt.close(fig)
 
 
+@profiled
 def scatterplot(
         data: pd.DataFrame,
         x: str,
         ys: list[str],
         hue: Optional[str] = None,
         ncols: int = 2,
-        save_path: Optional[Path] = None,
+        save_path: Optional[Union[Path, list[Path]]] = None,
+        show: bool = True,
+        binned: bool = False,
+        bins: int = 200,
+        sample_per_cell: int = 1,
+        summary: Optional[dict] = None,
 ) -> None:
     """
     Создает сетку диаграмм рассеяния для анализа зависимости переменных от базового признака.
@@ -105,8 +156,20 @@ def scatterplot(
         hue (Optional[str], optional): Имя категориальной колонки для разделения данных по цвету.
             По умолчанию None.
         ncols (int, optional): Количество колонок в сетке графиков. По умолчанию 2.
-        save_path (Optional[Path], optional): Путь для сохранения графика. Если None, график только отображается.
-            По умолчанию None.
+        save_path (Optional[Union[Path, list[Path]]], optional): Путь или список путей для сохранения
+            графика (например, PNG и SVG). Если None, график только отображается. По умолчанию None.
+        show (bool, optional): Если False, график не отображается через plt.show() (например,
+            при пакетной выгрузке на неинтерактивном бэкенде). По умолчанию True.
+        binned (bool, optional): Если True, вместо отдельных маркеров рисуется плотность
+            точек по сетке (`summarize_scatter`), по слою на каждое значение `hue`, поверх
+            которой показывается выборка точек из разреженных областей. Время отрисовки
+            и память перестают зависеть от количества строк. По умолчанию False.
+        bins (int, optional): Количество бинов сетки по каждой оси в режиме `binned`.
+            По умолчанию 200.
+        sample_per_cell (int, optional): Количество точек выборки на ячейку сетки и группу
+            `hue` в режиме `binned`; 0 отключает выборку. По умолчанию 1.
+        summary (Optional[dict], optional): Готовая сводка из `summarize_scatter`. Если
+            передана, используется режим `binned`, а `data` может быть None. По умолчанию None.
 
     Returns:
         None: Функция отображает графики через plt.show() и не возвращает значения.
@@ -118,7 +181,13 @@ def scatterplot(
         >>> # Анализ с разделением по городу и сохранением результата
         >>> scatterplot(df, x='temperature', ys=['sales', 'revenue'],
         ...             hue='city', save_path=Path('scatter_analysis.png'))
+        >>>
+        >>> # Быстрый режим для миллионов поездок
+        >>> scatterplot(rides_df, x='distance', ys=['duration'], hue='subscription_type', binned=True)
     """
+    if binned and summary is None:
+        summary = summarize_scatter(data, x, ys, hue=hue, bins=bins, sample_per_cell=sample_per_cell)
+
     plot_rows = int(np.ceil(len(ys) / ncols))
     fig, axes = plt.subplots(
         plot_rows,
@@ -132,7 +201,10 @@ def scatterplot(
         i, j = divmod(idx, ncols)
         ax = axes[i, j]
 
-        sns.scatterplot(data=data, x=x, y=y, hue=hue, ax=ax)
+        if summary is not None:
+            _draw_scatter_summary(ax, summary[y], x, y)
+        else:
+            sns.scatterplot(data=data, x=x, y=y, hue=hue, ax=ax)
 
         ax.set_xlabel(x)
         ax.set_ylabel(y)
@@ -143,7 +215,580 @@ def scatterplot(
 
     plt.suptitle(f"Диаграммы рассеяния относительно признака '{x}'")
 
-    if save_path:
-        plt.savefig(save_path)
-    plt.show()
-    plt.close(fig)
\ No newline at end of file
+    _save_figure(fig, save_path)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+# Во сколько раз сетка внутренних бинов сводки мельче бинов гистограммы.
+# Из внутренних бинов оцениваются квантили, усы и выбросы ящика с усами.
+SUMMARY_FINE_FACTOR = 64
+
+
+def _column_values(values: pd.Series) -> np.ndarray:
+    """
+    Возвращает значения колонки как float для сводок.
+
+    Даты переводятся в наносекунды (представление int64), пропуски — в NaN.
+
+    Raises:
+        ValueError: Если колонка не числовая и не содержит дат.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        result = values.to_numpy(dtype="datetime64[ns]").view("int64").astype(float)
+        result[values.isna().to_numpy()] = np.nan
+        return result
+    if not pd.api.types.is_numeric_dtype(values):
+        raise ValueError(f"Колонка {values.name} не числовая и не содержит дат: {values.dtype}")
+    return values.to_numpy(dtype=float)
+
+
+def _as_number(value) -> float:
+    """Переводит границу диапазона в число: даты — в наносекунды."""
+    if isinstance(value, (pd.Timestamp, np.datetime64, datetime)):
+        return float(pd.Timestamp(value).value)
+    return float(value)
+
+
+def _as_datetime(values) -> np.ndarray:
+    """Переводит наносекунды обратно в datetime64[ns]."""
+    return np.round(np.asarray(values, dtype=float)).astype(np.int64).view("datetime64[ns]")
+
+
+def _data_fingerprint(data: pd.DataFrame, columns: list[str]) -> str:
+    """Считает хеш содержимого колонок DataFrame для проверки актуальности кэша."""
+    hashes = pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def _quantile_from_counts(counts: np.ndarray, edges: np.ndarray, q: float) -> float:
+    """Оценивает квантиль по гистограмме линейной интерполяцией внутри бина."""
+    cumulative = np.cumsum(counts)
+    target = q * cumulative[-1]
+    idx = int(np.searchsorted(cumulative, target, side="left"))
+    before = cumulative[idx - 1] if idx > 0 else 0
+    share = (target - before) / counts[idx] if counts[idx] else 0.0
+    return float(edges[idx] + share * (edges[idx + 1] - edges[idx]))
+
+
+def _box_stats(fine_counts: np.ndarray, fine_edges: np.ndarray, low: float, high: float) -> dict:
+    """Считает статистики ящика с усами в формате `Axes.bxp` по мелкой гистограмме."""
+    q1, med, q3 = (_quantile_from_counts(fine_counts, fine_edges, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    lower_bound, upper_bound = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    # Центры непустых бинов; крайние заменяются точными минимумом и максимумом
+    centers = (fine_edges[:-1] + fine_edges[1:]) / 2
+    centers = np.clip(centers[fine_counts > 0], low, high)
+    inside = centers[(centers >= lower_bound) & (centers <= upper_bound)]
+
+    whislo = low if low >= lower_bound else (float(inside.min()) if inside.size else q1)
+    whishi = high if high <= upper_bound else (float(inside.max()) if inside.size else q3)
+    fliers = centers[(centers < lower_bound) | (centers > upper_bound)]
+
+    return {"med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi, "fliers": fliers}
+
+
+@profiled
+def summarize_hist_box(
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        columns: list[str],
+        hue: Optional[str] = None,
+        bins: int = 50,
+        ranges: Optional[dict[str, tuple[float, float]]] = None,
+        cache_path: Optional[Path] = None,
+        source: Optional[Path] = None,
+) -> dict:
+    """
+    Вычисляет сводки для гистограмм и ящиков с усами за один проход по данным.
+
+    Для каждой колонки и каждого значения `hue` векторно (через `np.bincount`)
+    накапливаются счетчики по мелкой сетке бинов, а также количество, сумма,
+    сумма квадратов, минимум и максимум. Из них строятся гистограмма с `bins`
+    бинами и статистики ящика с усами (квартили, усы, выбросы). Данные могут
+    подаваться частями, например из `pd.read_csv(..., chunksize=...)`.
+
+    Квантили, усы и выбросы оцениваются с точностью до ширины мелкого бина
+    (`(max - min) / (bins * SUMMARY_FINE_FACTOR)`), минимум и максимум — точно.
+    Колонки с датами сводятся по наносекундам, а границы бинов, среднее,
+    стандартное отклонение и статистики ящика возвращаются как datetime64/timedelta64.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame или итератор его частей.
+        columns (list[str]): Список имен числовых колонок или колонок с датами.
+        hue (Optional[str], optional): Имя категориальной колонки для разделения данных.
+            По умолчанию None.
+        bins (int, optional): Количество бинов гистограммы. По умолчанию 50.
+        ranges (Optional[dict[str, tuple[float, float]]], optional): Диапазоны значений
+            колонок. Обязательны, если данные передаются частями; для DataFrame по
+            умолчанию берутся минимум и максимум колонки. По умолчанию None.
+        cache_path (Optional[Path], optional): Файл для кэширования сводки (pickle).
+            Если файл существует и был построен с теми же параметрами по тем же
+            данным, сводка читается из него без прохода по данным. Данные сверяются
+            по хешу колонок DataFrame или, для частей, по отпечатку `source`.
+            По умолчанию None.
+        source (Optional[Path], optional): Файл, из которого читаются части данных.
+            Обязателен для кэширования сводки по частям. По умолчанию None.
+
+    Returns:
+        dict: Словарь {колонка: {'edges': границы бинов, 'groups': {значение hue:
+        {'counts', 'fine_counts', 'n', 'mean', 'std', 'box'}}}}. При `hue=None`
+        единственная группа имеет ключ None.
+
+    Raises:
+        ValueError: Если данные переданы частями без `ranges`, если для кэширования
+            частей не указан `source` или если колонка не числовая и не содержит дат.
+
+    Example:
+        >>> chunks = pd.read_csv(path, chunksize=1_000_000)
+        >>> summary = summarize_hist_box(chunks, ["duration"], hue="subscription_type",
+        ...                              ranges={"duration": (0, 41)})
+        >>> hist_boxplot(None, ["duration"], summary=summary)
+    """
+    is_frame = isinstance(data, pd.DataFrame)
+    if cache_path is not None:
+        if is_frame:
+            data_key = _data_fingerprint(data, [*columns, hue] if hue is not None else list(columns))
+        elif source is not None:
+            data_key = _source_fingerprint(Path(source), "mtime")
+        else:
+            raise ValueError("Для кэширования сводки по частям данных нужно указать source.")
+        params = {"columns": list(columns), "hue": hue, "bins": bins, "ranges": ranges, "data": data_key}
+        if Path(cache_path).exists():
+            with open(cache_path, "rb") as file:
+                cached = pickle.load(file)
+            if cached["params"] == params:
+                return cached["summary"]
+
+    if ranges is None:
+        if not is_frame:
+            raise ValueError("Для данных, переданных частями, нужно указать ranges.")
+        ranges = {}
+        for col in columns:
+            values = _column_values(data[col])
+            ranges[col] = (float(np.nanmin(values)), float(np.nanmax(values)))
+    else:
+        ranges = {col: (_as_number(low), _as_number(high)) for col, (low, high) in ranges.items()}
+
+    resolution = bins * SUMMARY_FINE_FACTOR
+    labels: dict = {}
+    datetime_columns: set[str] = set()
+    state = {
+        col: {
+            "counts": np.zeros((0, resolution), dtype=np.int64),
+            "moments": np.zeros((0, 3)),
+            "low": np.zeros(0),
+            "high": np.zeros(0),
+        }
+        for col in columns
+    }
+
+    for chunk in _iter_chunks(data):
+        if hue is None:
+            codes = np.zeros(len(chunk), dtype=np.int64)
+        else:
+            chunk_codes, uniques = pd.factorize(chunk[hue])
+            mapping = np.array([labels.setdefault(label, len(labels)) for label in uniques], dtype=np.int64)
+            codes = np.where(chunk_codes >= 0, mapping[chunk_codes] if mapping.size else -1, -1)
+        if hue is None and None not in labels:
+            labels[None] = 0
+        n_groups = len(labels)
+
+        for col in columns:
+            col_state = state[col]
+            grow = n_groups - col_state["counts"].shape[0]
+            if grow > 0:
+                col_state["counts"] = np.vstack([col_state["counts"], np.zeros((grow, resolution), np.int64)])
+                col_state["moments"] = np.vstack([col_state["moments"], np.zeros((grow, 3))])
+                col_state["low"] = np.concatenate([col_state["low"], np.full(grow, np.inf)])
+                col_state["high"] = np.concatenate([col_state["high"], np.full(grow, -np.inf)])
+
+            if pd.api.types.is_datetime64_any_dtype(chunk[col]):
+                datetime_columns.add(col)
+            values = _column_values(chunk[col])
+            valid = ~np.isnan(values) & (codes >= 0)
+            values, groups = values[valid], codes[valid]
+
+            low, high = ranges[col]
+            width = (high - low) or 1.0
+            positions = np.clip(((values - low) / width * resolution).astype(np.int64), 0, resolution - 1)
+            col_state["counts"] += np.bincount(
+                groups * resolution + positions, minlength=n_groups * resolution
+            ).reshape(n_groups, resolution)
+
+            col_state["moments"][:, 0] += np.bincount(groups, minlength=n_groups)
+            col_state["moments"][:, 1] += np.bincount(groups, weights=values, minlength=n_groups)
+            col_state["moments"][:, 2] += np.bincount(groups, weights=values**2, minlength=n_groups)
+            np.minimum.at(col_state["low"], groups, values)
+            np.maximum.at(col_state["high"], groups, values)
+
+    summary = {}
+    for col in columns:
+        low, high = ranges[col]
+        fine_edges = np.linspace(low, high, resolution + 1)
+        col_state = state[col]
+        groups = {}
+        for label, idx in sorted(labels.items(), key=lambda item: str(item[0])):
+            n, total, squares = col_state["moments"][idx]
+            if n == 0:
+                continue
+            fine_counts = col_state["counts"][idx]
+            mean = total / n
+            std = float(np.sqrt(max(squares / n - mean**2, 0.0)))
+            box = _box_stats(fine_counts, fine_edges, col_state["low"][idx], col_state["high"][idx])
+            if col in datetime_columns:
+                mean = _as_datetime(mean)[()]
+                std = np.timedelta64(round(std), "ns")
+                box = {name: _as_datetime(value) for name, value in box.items()}
+                box = {name: value if name == "fliers" else value[()] for name, value in box.items()}
+            groups[label] = {
+                "counts": fine_counts.reshape(bins, SUMMARY_FINE_FACTOR).sum(axis=1),
+                "fine_counts": fine_counts,
+                "n": int(n),
+                "mean": mean,
+                "std": std,
+                "box": {**box, "label": "" if label is None else str(label)},
+            }
+        edges = fine_edges[::SUMMARY_FINE_FACTOR]
+        summary[col] = {"edges": _as_datetime(edges) if col in datetime_columns else edges, "groups": groups}
+
+    if cache_path is not None:
+        with open(cache_path, "wb") as file:
+            pickle.dump({"params": params, "summary": summary}, file)
+
+    return summary
+
+
+def _draw_hist_box_summary(ax_hist, ax_box, col_summary: dict, kde: bool) -> None:
+    """Рисует гистограмму и ящик с усами по готовой сводке одной колонки."""
+    edges = col_summary["edges"]
+    groups = col_summary["groups"]
+    palette = sns.color_palette(n_colors=max(len(groups), 1))
+
+    # Даты рисуются в числовых единицах matplotlib (дни) с форматированием оси как дат
+    is_datetime = np.issubdtype(edges.dtype, np.datetime64)
+    if is_datetime:
+        edges = mdates.date2num(edges)
+        for ax in (ax_hist, ax_box):
+            ax.xaxis_date()
+
+    for color, (label, group) in zip(palette, groups.items()):
+        ax_hist.stairs(
+            group["counts"], edges, fill=True, alpha=0.5 if len(groups) > 1 else 0.8,
+            color=color, label=None if label is None else str(label),
+        )
+        std = group["std"] / np.timedelta64(1, "D") if is_datetime else group["std"]
+        if kde and group["n"] > 1 and std > 0:
+            fine_counts = group["fine_counts"]
+            fine_width = (edges[-1] - edges[0]) / fine_counts.size
+            bandwidth = 1.06 * std * group["n"] ** (-1 / 5) / fine_width
+            offsets = np.arange(-int(4 * bandwidth) - 1, int(4 * bandwidth) + 2)
+            kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+            density = np.convolve(fine_counts, kernel / kernel.sum(), mode="same")
+            centers = np.linspace(edges[0], edges[-1], fine_counts.size, endpoint=False) + fine_width / 2
+            ax_hist.plot(centers, density * SUMMARY_FINE_FACTOR, color=color)
+
+    if len(groups) > 1:
+        ax_hist.legend()
+
+    box_stats = [group["box"] for group in groups.values()]
+    if is_datetime:
+        box_stats = [
+            {name: value if name == "label" else mdates.date2num(value) for name, value in box.items()}
+            for box in box_stats
+        ]
+    boxes = ax_box.bxp(box_stats, orientation="horizontal", patch_artist=True, widths=0.6)
+    for patch, color in zip(boxes["boxes"], palette):
+        patch.set_facecolor(color)
+
+
+def _bottom_k(keys: np.ndarray, strata: np.ndarray, k: int) -> np.ndarray:
+    """Возвращает позиции `k` наименьших ключей (из [0, 1)) в каждой страте."""
+    # Предотбор за O(n): в страте из c точек k наименьших ключей почти наверняка
+    # меньше 4k/c. Страты, где порог прошло меньше k точек, берутся целиком,
+    # поэтому результат точный, а сортируются только кандидаты
+    counts = np.bincount(strata)
+    threshold = np.minimum(1.0, 4 * k / np.maximum(counts, 1))
+    passed = keys < threshold[strata]
+    short = np.bincount(strata[passed], minlength=counts.size) < np.minimum(counts, k)
+    candidates = np.flatnonzero(passed | short[strata])
+
+    order = candidates[np.lexsort((keys[candidates], strata[candidates]))]
+    sorted_strata = strata[order]
+    starts = np.flatnonzero(np.r_[True, sorted_strata[1:] != sorted_strata[:-1]])
+    ranks = np.arange(order.size) - np.repeat(starts, np.diff(np.r_[starts, order.size]))
+    return order[ranks < k]
+
+
+@profiled
+def summarize_scatter(
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        x: str,
+        ys: list[str],
+        hue: Optional[str] = None,
+        bins: int = 200,
+        ranges: Optional[dict[str, tuple[float, float]]] = None,
+        sample_per_cell: int = 1,
+        seed: Optional[int] = None,
+) -> dict:
+    """
+    Вычисляет двумерные гистограммы для диаграмм рассеяния за один проход по данным.
+
+    Для каждой пары (`x`, y) и каждого значения `hue` точки векторно (через
+    `np.bincount`) раскладываются по сетке `bins` × `bins`. Параллельно ведется
+    резервуарная выборка, стратифицированная по группе `hue` и ячейке сетки:
+    каждая точка получает случайный ключ, и в каждой страте хранятся
+    `sample_per_cell` точек с наименьшими ключами. Поэтому выборка содержит
+    реальные точки из каждой непустой ячейки, в том числе из редких выбросов,
+    а память ограничена размером сетки и не зависит от количества строк.
+    Данные могут подаваться частями, например из `pd.read_csv(..., chunksize=...)`.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame или итератор его частей.
+        x (str): Имя признака для оси X.
+        ys (list[str]): Имена признаков для оси Y.
+        hue (Optional[str], optional): Имя категориальной колонки для разделения данных.
+            По умолчанию None.
+        bins (int, optional): Количество бинов сетки по каждой оси. По умолчанию 200.
+        ranges (Optional[dict[str, tuple[float, float]]], optional): Диапазоны значений
+            `x` и `ys`. Обязательны, если данные передаются частями; для DataFrame по
+            умолчанию берутся минимум и максимум колонок. По умолчанию None.
+        sample_per_cell (int, optional): Количество точек выборки на ячейку сетки и
+            группу `hue`; 0 отключает выборку. По умолчанию 1.
+        seed (Optional[int], optional): Зерно генератора ключей выборки. По умолчанию None.
+
+    Returns:
+        dict: Словарь {y: {'x_edges', 'y_edges', 'groups': {значение hue: {'counts'
+        (массив bins × bins), 'sample' (DataFrame с колонками x и y)}}}}. При
+        `hue=None` единственная группа имеет ключ None.
+
+    Raises:
+        ValueError: Если данные переданы частями без `ranges`.
+
+    Example:
+        >>> chunks = pd.read_csv(path, chunksize=1_000_000)
+        >>> summary = summarize_scatter(chunks, "distance", ["duration"], hue="subscription_type",
+        ...                             ranges={"distance": (0, 7300), "duration": (0, 41)})
+        >>> scatterplot(None, "distance", ["duration"], summary=summary)
+    """
+    columns = [x, *ys]
+    if ranges is None:
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("Для данных, переданных частями, нужно указать ranges.")
+        ranges = {col: (float(data[col].min()), float(data[col].max())) for col in columns}
+
+    rng = np.random.default_rng(seed)
+    labels: dict = {}
+    counts = {y: np.zeros((0, bins, bins), dtype=np.int64) for y in ys}
+    # Резервуар по каждой паре (x, y): ключ, страта (группа и ячейка) и координаты точек
+    reservoirs = {
+        y: {"keys": np.zeros(0), "cells": np.zeros(0, dtype=np.int64), x: np.zeros(0), y: np.zeros(0)}
+        for y in ys
+    }
+
+    def positions(col: str, values: np.ndarray) -> np.ndarray:
+        low, high = ranges[col]
+        width = (high - low) or 1.0
+        return np.clip(((values - low) / width * bins).astype(np.int64), 0, bins - 1)
+
+    for chunk in _iter_chunks(data):
+        if hue is None:
+            codes = np.zeros(len(chunk), dtype=np.int64)
+            labels.setdefault(None, 0)
+        else:
+            chunk_codes, uniques = pd.factorize(chunk[hue])
+            mapping = np.array([labels.setdefault(label, len(labels)) for label in uniques], dtype=np.int64)
+            codes = np.where(chunk_codes >= 0, mapping[chunk_codes] if mapping.size else -1, -1)
+        n_groups = len(labels)
+
+        x_values = chunk[x].to_numpy(dtype=float)
+        valid_x = ~np.isnan(x_values) & (codes >= 0)
+        x_positions = positions(x, x_values)
+
+        for y in ys:
+            grow = n_groups - counts[y].shape[0]
+            if grow > 0:
+                counts[y] = np.concatenate([counts[y], np.zeros((grow, bins, bins), np.int64)])
+            y_values = chunk[y].to_numpy(dtype=float)
+            valid = valid_x & ~np.isnan(y_values)
+            cells = (codes[valid] * bins + x_positions[valid]) * bins + positions(y, y_values[valid])
+            counts[y] += np.bincount(cells, minlength=n_groups * bins * bins).reshape(n_groups, bins, bins)
+
+            if sample_per_cell:
+                reservoir = reservoirs[y]
+                candidates = {
+                    "keys": np.concatenate([reservoir["keys"], rng.random(cells.size)]),
+                    "cells": np.concatenate([reservoir["cells"], cells]),
+                    x: np.concatenate([reservoir[x], x_values[valid]]),
+                    y: np.concatenate([reservoir[y], y_values[valid]]),
+                }
+                keep = _bottom_k(candidates["keys"], candidates["cells"], sample_per_cell)
+                reservoirs[y] = {name: values[keep] for name, values in candidates.items()}
+
+    summary = {}
+    x_edges = np.linspace(*ranges[x], bins + 1)
+    for y in ys:
+        reservoir = reservoirs[y]
+        sample_groups = reservoir["cells"] // (bins * bins)
+        groups = {}
+        for label, idx in sorted(labels.items(), key=lambda item: str(item[0])):
+            if not counts[y][idx].any():
+                continue
+            in_group = sample_groups == idx
+            groups[label] = {
+                "counts": counts[y][idx],
+                "sample": pd.DataFrame({x: reservoir[x][in_group], y: reservoir[y][in_group]}),
+            }
+        summary[y] = {"x_edges": x_edges, "y_edges": np.linspace(*ranges[y], bins + 1), "groups": groups}
+
+    return summary
+
+
+def _draw_scatter_summary(ax, y_summary: dict, x: str, y: str) -> None:
+    """Рисует плотность точек по сетке и выборку точек из разреженных областей."""
+    x_edges, y_edges = y_summary["x_edges"], y_summary["y_edges"]
+    groups = y_summary["groups"]
+    palette = sns.color_palette(n_colors=max(len(groups), 1))
+    extent = (x_edges[0], x_edges[-1], y_edges[0], y_edges[-1])
+
+    handles = []
+    for color, (label, group) in zip(palette, groups.items()):
+        counts = group["counts"]
+        # Логарифмическая шкала: одиночные точки видны рядом с плотным ядром
+        density = np.log1p(counts) / np.log1p(counts.max())
+        image = np.zeros((*counts.T.shape, 4))
+        image[..., :3] = color
+        image[..., 3] = 0.9 * density.T
+        ax.imshow(image, extent=extent, origin="lower", aspect="auto", interpolation="nearest")
+
+        # Точки выборки рисуются только там, где плотность мала и изображение почти прозрачно
+        sample = group["sample"]
+        if not sample.empty:
+            x_pos = np.clip(np.searchsorted(x_edges, sample[x], side="right") - 1, 0, counts.shape[0] - 1)
+            y_pos = np.clip(np.searchsorted(y_edges, sample[y], side="right") - 1, 0, counts.shape[1] - 1)
+            sparse = density[x_pos, y_pos] < 0.25
+            ax.scatter(sample[x][sparse], sample[y][sparse], s=6, color=color, alpha=0.8, linewidths=0)
+
+        handles.append(matplotlib.patches.Patch(color=color, label=None if label is None else str(label)))
+
+    if len(groups) > 1:
+        ax.legend(handles=handles)
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """
+    Описание одной фигуры для пакетной выгрузки `export_figures`.
+
+    Attributes:
+        func (str): Имя функции построения из этого модуля: 'hist_boxplot' или 'scatterplot'.
+        data (Union[str, pd.DataFrame]): Имя файла данных для `load_data`
+            (например, 'cleaned_rides_users_subscriptions_go.csv') или готовый DataFrame.
+            Имя файла предпочтительнее: данные читаются из кэша в каждом процессе
+            и не передаются между процессами.
+        kwargs (dict): Аргументы функции построения, кроме `data`, `save_path` и `show`
+            (например, {'columns': ['duration'], 'hue': 'subscription_type'}).
+        name (Optional[str]): Имя файла без расширения. Если None, строится
+            детерминированно из функции и хеша параметров.
+    """
+
+    func: str
+    data: Union[str, pd.DataFrame]
+    kwargs: dict = field(default_factory=dict)
+    name: Optional[str] = None
+
+    def filename(self) -> str:
+        """Возвращает детерминированное имя файла фигуры без расширения."""
+        if self.name is not None:
+            return self.name
+        if isinstance(self.data, str):
+            data_key = self.data
+        else:
+            data_key = str(pd.util.hash_pandas_object(self.data).sum())
+        payload = json.dumps([self.func, data_key, self.kwargs], sort_keys=True, default=str)
+        return f"{self.func}_{hashlib.sha1(payload.encode()).hexdigest()[:10]}"
+
+
+_FIGURE_FUNCTIONS = {"hist_boxplot": hist_boxplot, "scatterplot": scatterplot}
+
+
+def _use_headless_backend() -> None:
+    """Переключает matplotlib на неинтерактивный бэкенд Agg в процессе-исполнителе."""
+    matplotlib.use("Agg", force=True)
+
+
+@lru_cache(maxsize=8)
+def _load_figure_data(filename: str) -> pd.DataFrame:
+    """Загружает данные фигуры один раз на процесс."""
+    from .loader import load_data
+
+    return load_data(filename)
+
+
+def _render_figure(spec: FigureSpec, paths: list[Path]) -> list[Path]:
+    """Строит одну фигуру по описанию и сохраняет ее во все форматы."""
+    data = _load_figure_data(spec.data) if isinstance(spec.data, str) else spec.data
+    _FIGURE_FUNCTIONS[spec.func](data, **spec.kwargs, save_path=paths, show=False)
+    return paths
+
+
+def export_figures(
+        specs: list[FigureSpec],
+        output_dir: Path,
+        formats: tuple[str, ...] = ("png",),
+        n_jobs: Optional[int] = None,
+) -> list[list[Path]]:
+    """
+    Параллельно строит и сохраняет набор фигур без отображения на экране.
+
+    Каждая фигура строится функцией `hist_boxplot` или `scatterplot` на бэкенде
+    Agg в процессе пула и сохраняется во все форматы из `formats` под
+    детерминированным именем (`FigureSpec.filename`). Бэкенд и открытые фигуры
+    вызывающего процесса не затрагиваются.
+
+    Args:
+        specs (list[FigureSpec]): Описания фигур.
+        output_dir (Path): Каталог для сохранения. Создается при необходимости.
+        formats (tuple[str, ...], optional): Расширения файлов, например ('png', 'svg').
+            По умолчанию ('png',).
+        n_jobs (Optional[int], optional): Количество процессов. Если None, используются
+            все ядра; 1 — все фигуры строятся в одном процессе. По умолчанию None.
+
+    Returns:
+        list[list[Path]]: Пути сохраненных файлов для каждой фигуры в порядке `specs`.
+
+    Raises:
+        ValueError: Если в описании указана неизвестная функция или имена файлов совпадают.
+
+    Example:
+        >>> specs = [
+        ...     FigureSpec("hist_boxplot", "cleaned_rides_users_subscriptions_go.csv",
+        ...                {"columns": ["duration", "distance"], "hue": "subscription_type"}),
+        ...     FigureSpec("scatterplot", "rides_go.csv",
+        ...                {"x": "duration", "ys": ["distance"]}, name="duration_distance"),
+        ... ]
+        >>> export_figures(specs, Path("reports"), formats=("png", "svg"))
+    """
+    for spec in specs:
+        if spec.func not in _FIGURE_FUNCTIONS:
+            raise ValueError(f"Неизвестная функция построения: {spec.func}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = [[output_dir / f"{spec.filename()}.{fmt}" for fmt in formats] for spec in specs]
+    if len({path for spec_paths in paths for path in spec_paths}) != len(specs) * len(formats):
+        raise ValueError("Имена файлов фигур совпадают, задайте FigureSpec.name.")
+
+    # Кэш данных собирается заранее, чтобы процессы не пересобирали его одновременно
+    for filename in {spec.data for spec in specs if isinstance(spec.data, str)}:
+        _load_figure_data(filename)
+
+    # Даже при n_jobs=1 фигуры строятся в дочернем процессе: смена бэкенда pyplot
+    # в текущем процессе закрыла бы открытые фигуры пользователя
+    n_jobs = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+            max_workers=max(1, min(n_jobs, len(specs))), initializer=_use_headless_backend
+    ) as executor:
+        return list(executor.map(_render_figure, specs, paths))